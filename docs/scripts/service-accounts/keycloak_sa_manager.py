@@ -3,50 +3,95 @@
 Keycloak Service Account Manager
 Comprehensive tool for managing Keycloak-based service accounts for Kubernetes
 """
-import requests
 import json
+import sys
 import yaml
 import os
 import base64
 import subprocess
 from datetime import datetime, timedelta
 import getpass
+import time
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    sys.exit("❌ The requests package is required: pip install 'itlc[scripts]'")
+
 
 class KeycloakServiceAccountManager:
     def __init__(self, keycloak_url="https://sts.itlusions.com", realm="itlusions"):
         self.keycloak_url = keycloak_url.rstrip('/')
         self.realm = realm
         self.admin_token = None
+        self._admin_exp = 0           # refresh the admin token once past this time
+        self._admin_refresh = None
+        self._admin_credentials = None  # only used if the refresh grant fails
+        
+        # One pooled session so every admin call reuses the same TLS connection
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        
+        # Admin lookups that don't change during a run, so each is fetched once
+        self._client_info = {}   # client_id -> {"client_id", "client_secret", "client_uuid"}
+        self._sa_user_ids = {}   # client_id -> service account user id
+        self._group_ids = {}     # group name -> group id
         
     def get_admin_token(self, username, password):
         """Get admin token for Keycloak operations"""
-        url = f"{self.keycloak_url}/realms/master/protocol/openid-connect/token"
-        data = {
+        self._admin_credentials = (username, password)
+        return self._request_admin_token({
             "username": username,
             "password": password,
             "grant_type": "password",
             "client_id": "admin-cli"
-        }
-        
-        response = requests.post(url, data=data)
+        })
+    
+    def _request_admin_token(self, data, quiet=False):
+        """POST to the master realm token endpoint and store the admin token"""
+        url = f"{self.keycloak_url}/realms/master/protocol/openid-connect/token"
+        response = self.session.post(url, data=data, headers={"Authorization": None})
         if response.status_code == 200:
-            self.admin_token = response.json().get("access_token")
+            payload = response.json()
+            self.admin_token = payload.get("access_token")
+            # Refresh a little early so a call never goes out with an expiring token;
+            # the margin scales with the lifetime, as admin tokens last only minutes
+            expires_in = payload.get("expires_in", 60)
+            self._admin_exp = time.time() + expires_in - min(30, expires_in // 10)
+            self._admin_refresh = payload.get("refresh_token")
+            self.session.headers["Authorization"] = f"Bearer {self.admin_token}"
             return True
         else:
-            print(f"❌ Failed to get admin token: {response.text}")
+            if not quiet:
+                print(f"❌ Failed to get admin token: {response.text}")
+            return False
+    
+    def _ensure_admin_token(self):
+        """Make sure a usable admin token is set, refreshing it when it is due"""
+        if not self.admin_token:
             return False
+        if time.time() < self._admin_exp:
+            return True
+        
+        # An expired refresh token is expected; only report it when there is no fallback
+        if self._admin_refresh and self._request_admin_token({
+            "grant_type": "refresh_token",
+            "refresh_token": self._admin_refresh,
+            "client_id": "admin-cli"
+        }, quiet=bool(self._admin_credentials)):
+            return True
+        if self._admin_credentials:
+            return self.get_admin_token(*self._admin_credentials)
+        return False
     
     def create_service_account_client(self, client_id, description="Kubernetes Service Account"):
         """Create a service account client in Keycloak"""
-        if not self.admin_token:
+        if not self._ensure_admin_token():
             print("❌ No admin token available")
             return None
             
         url = f"{self.keycloak_url}/admin/realms/{self.realm}/clients"
-        headers = {
-            "Authorization": f"Bearer {self.admin_token}",
-            "Content-Type": "application/json"
-        }
         
         client_data = {
             "clientId": client_id,
@@ -67,9 +112,13 @@ class KeycloakServiceAccountManager:
             }
         }
         
-        response = requests.post(url, headers=headers, json=client_data)
+        response = self.session.post(url, json=client_data)
         if response.status_code == 201:
             print(f"✅ Service account client '{client_id}' created")
+            # The Location header names the new client, saving a clientId search
+            location = response.headers.get("Location")
+            if location:
+                return self._fetch_client_secret(client_id, location.rstrip('/').rsplit('/', 1)[-1])
             return self.get_client_info(client_id)
         else:
             print(f"❌ Failed to create client: {response.text}")
@@ -77,15 +126,16 @@ class KeycloakServiceAccountManager:
     
     def get_client_info(self, client_id):
         """Get client information including secret"""
-        if not self.admin_token:
+        if not self._ensure_admin_token():
             return None
+        if client_id in self._client_info:
+            return self._client_info[client_id]
             
         # Get client UUID
         url = f"{self.keycloak_url}/admin/realms/{self.realm}/clients"
-        headers = {"Authorization": f"Bearer {self.admin_token}"}
         params = {"clientId": client_id}
         
-        response = requests.get(url, headers=headers, params=params)
+        response = self.session.get(url, params=params)
         if response.status_code != 200:
             return None
             
@@ -93,61 +143,65 @@ class KeycloakServiceAccountManager:
         if not clients:
             return None
             
-        client_uuid = clients[0]["id"]
-        
-        # Get client secret
+        return self._fetch_client_secret(client_id, clients[0]["id"])
+    
+    def _fetch_client_secret(self, client_id, client_uuid):
+        """Get the secret of a client with a known UUID and cache the client info"""
         secret_url = f"{self.keycloak_url}/admin/realms/{self.realm}/clients/{client_uuid}/client-secret"
-        secret_response = requests.get(secret_url, headers=headers)
+        secret_response = self.session.get(secret_url)
         
         if secret_response.status_code == 200:
             client_secret = secret_response.json().get("value")
-            return {
+            self._client_info[client_id] = {
                 "client_id": client_id,
                 "client_secret": client_secret,
                 "client_uuid": client_uuid
             }
+            return self._client_info[client_id]
         return None
     
     def add_client_to_group(self, client_id, group_name="itl-cluster-admin"):
         """Add service account to a Keycloak group"""
-        if not self.admin_token:
+        if not self._ensure_admin_token():
             return False
             
-        headers = {"Authorization": f"Bearer {self.admin_token}"}
-        
         # Get client info
         client_info = self.get_client_info(client_id)
         if not client_info:
             return False
             
         # Get service account user
-        sa_url = f"{self.keycloak_url}/admin/realms/{self.realm}/clients/{client_info['client_uuid']}/service-account-user"
-        sa_response = requests.get(sa_url, headers=headers)
-        
-        if sa_response.status_code != 200:
-            print("❌ Failed to get service account user")
-            return False
+        sa_user_id = self._sa_user_ids.get(client_id)
+        if not sa_user_id:
+            sa_url = f"{self.keycloak_url}/admin/realms/{self.realm}/clients/{client_info['client_uuid']}/service-account-user"
+            sa_response = self.session.get(sa_url)
             
-        sa_user_id = sa_response.json().get("id")
+            if sa_response.status_code != 200:
+                print("❌ Failed to get service account user")
+                return False
+                
+            sa_user_id = self._sa_user_ids[client_id] = sa_response.json().get("id")
         
         # Get group ID
-        groups_url = f"{self.keycloak_url}/admin/realms/{self.realm}/groups"
-        groups_response = requests.get(groups_url, headers=headers, params={"search": group_name})
-        
-        if groups_response.status_code != 200:
-            print(f"❌ Failed to find group: {group_name}")
-            return False
+        group_id = self._group_ids.get(group_name)
+        if not group_id:
+            groups_url = f"{self.keycloak_url}/admin/realms/{self.realm}/groups"
+            groups_response = self.session.get(groups_url, params={"search": group_name})
             
-        groups = groups_response.json()
-        if not groups:
-            print(f"❌ Group '{group_name}' not found")
-            return False
-            
-        group_id = groups[0]["id"]
+            if groups_response.status_code != 200:
+                print(f"❌ Failed to find group: {group_name}")
+                return False
+                
+            groups = groups_response.json()
+            if not groups:
+                print(f"❌ Group '{group_name}' not found")
+                return False
+                
+            group_id = self._group_ids[group_name] = groups[0]["id"]
         
         # Add user to group
         add_url = f"{self.keycloak_url}/admin/realms/{self.realm}/users/{sa_user_id}/groups/{group_id}"
-        add_response = requests.put(add_url, headers=headers)
+        add_response = self.session.put(add_url)
         
         if add_response.status_code == 204:
             print(f"✅ Service account added to group: {group_name}")
@@ -165,7 +219,8 @@ class KeycloakServiceAccountManager:
             "client_secret": client_secret
         }
         
-        response = requests.post(url, data=data)
+        # The service account authenticates itself; don't send the admin token along
+        response = self.session.post(url, data=data, headers={"Authorization": None})
         if response.status_code == 200:
             token_data = response.json()
             return {
@@ -180,17 +235,13 @@ class KeycloakServiceAccountManager:
         if not output_path:
             output_path = f"{os.path.expanduser('~')}/.kube/config-sa-{client_id}"
         
-        # Get cluster info
+        # Get cluster info (server and CA from a single kubectl invocation)
         try:
-            cluster_url = subprocess.check_output([
-                "kubectl", "config", "view", "--minify", 
-                "-o", "jsonpath={.clusters[0].cluster.server}"
-            ], text=True).strip()
-            
-            cluster_ca = subprocess.check_output([
+            cluster_info = subprocess.check_output([
                 "kubectl", "config", "view", "--raw", "--minify", "--flatten",
-                "-o", "jsonpath={.clusters[0].cluster.certificate-authority-data}"
+                "-o", "jsonpath={.clusters[0].cluster.server} {.clusters[0].cluster.certificate-authority-data}"
             ], text=True).strip()
+            cluster_url, _, cluster_ca = cluster_info.partition(" ")
         except subprocess.CalledProcessError:
             print("❌ Failed to get cluster information")
             return None
@@ -234,7 +285,8 @@ class KeycloakServiceAccountManager:
         }
         
         with open(output_path, "w") as f:
-            yaml.dump(kubeconfig, f, default_flow_style=False)
+            yaml.dump(kubeconfig, f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+                      default_flow_style=False)
         
         print(f"✅ Kubeconfig created: {output_path}")
         return output_path
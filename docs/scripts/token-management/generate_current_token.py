@@ -5,49 +5,105 @@ Creates a fresh token using your current OIDC session
 """
 import subprocess
 import json
-import yaml
 import os
+import atexit
 import base64
+import tempfile
 from datetime import datetime
 
+try:
+    import orjson
+    from orjson import loads as _jloads
+except ImportError:
+    orjson = None
+    from json import loads as _jloads
+
+# Section separators
+_SEP40 = "=" * 40
+_SEP50 = "=" * 50
+
+# Token info keys holding credentials that must never be written to disk
+_SECRET_KEYS = frozenset({"access_token", "id_token", "refresh_token", "token"})
+
+# External commands, built once at import time
+_KCTL_WHOAMI = ("kubectl", "auth", "whoami")
+# JSON output lets us skip PyYAML entirely when reading the kubeconfig
+_KCTL_CONFIG_VIEW_RAW = ("kubectl", "config", "view", "--raw", "--minify", "--flatten",
+                         "-o", "json")
+_KUBELOGIN_GET_TOKEN = (
+    "kubelogin", "get-token",
+    "--login", "devicecode",
+    "--server-id", "kubernetes-oidc",
+    "--client-id", "kubernetes-oidc",
+    "--tenant-id", "itlusions"
+)
+
+# Output locations, resolved against the home directory once at import time
+_KUBE_DIR = os.path.expanduser("~/.kube")
+_TOKEN_FILE = os.path.join(_KUBE_DIR, "current-token.txt")
+_TOKEN_INFO_FILE = os.path.join(_KUBE_DIR, "current-token-info.json")
+_BEARER_KUBECONFIG_FILE = os.path.join(_KUBE_DIR, "config-current-token")
+
+# Decoded cluster CA bundles written to disk, keyed by their base64 source
+_CA_BUNDLES = {}
+
+# Shared HTTP session so repeated API probes reuse the same TLS connection.
+# Created on first use so runs that never hit the API skip importing requests.
+_SESSION = None
+
+
+def _get_session():
+    """Return the shared requests session, creating it on first use"""
+    global _SESSION
+    if _SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        _SESSION = requests.Session()
+        _SESSION.headers.update({"Accept": "application/json"})
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return _SESSION
+
+
 def get_current_oidc_token():
-    """Extract or generate a fresh OIDC token for the current user"""
+    """Extract or generate a fresh OIDC token for the current user
+    
+    Returns a (token_info, config) tuple where config is the parsed minified
+    kubeconfig, so callers don't have to shell out to kubectl again.
+    """
     print("🔑 Getting Current User OIDC Token")
-    print("=" * 40)
+    print(_SEP40)
     
     # Check current authentication
     print("👤 Current user:")
     try:
-        whoami_result = subprocess.run(["kubectl", "auth", "whoami"], 
+        whoami_result = subprocess.run(_KCTL_WHOAMI,
                                      capture_output=True, text=True, check=True)
         print(whoami_result.stdout)
     except subprocess.CalledProcessError as e:
         print(f"❌ Error checking current user: {e}")
-        return None
+        return None, None
     
     # Get kubeconfig info
     try:
-        config_result = subprocess.run([
-            "kubectl", "config", "view", "--raw", "--minify"
-        ], capture_output=True, text=True, check=True)
+        # Read raw bytes from the pipe: the JSON parser takes them without a str decode
+        with subprocess.Popen(_KCTL_CONFIG_VIEW_RAW, stdout=subprocess.PIPE) as proc:
+            raw_config = proc.stdout.read()
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, _KCTL_CONFIG_VIEW_RAW)
         
-        config = yaml.safe_load(config_result.stdout)
+        config = _jloads(raw_config)
         current_context = config.get("current-context")
         
         # Find current user
-        current_user = None
-        for context in config.get("contexts", []):
-            if context["name"] == current_context:
-                user_name = context["context"]["user"]
-                for user in config.get("users", []):
-                    if user["name"] == user_name:
-                        current_user = user
-                        break
-                break
+        ctx_by_name = {c["name"]: c["context"] for c in config.get("contexts") or []}
+        usr_by_name = {u["name"]: u for u in config.get("users") or []}
+        ctx = ctx_by_name.get(current_context)
+        current_user = usr_by_name.get(ctx["user"]) if ctx else None
         
         if not current_user:
             print("❌ Could not find current user configuration")
-            return None
+            return None, config
         
         print(f"📋 Current user: {current_user['name']}")
         
@@ -56,40 +112,35 @@ def get_current_oidc_token():
         
         if "exec" in user_config:
             print("✅ Using exec-based authentication (kubelogin)")
-            return get_token_with_kubelogin()
+            return get_token_with_kubelogin(), config
         elif "auth-provider" in user_config:
             print("✅ Using auth-provider (legacy)")
-            return extract_auth_provider_token(user_config["auth-provider"])
+            return extract_auth_provider_token(user_config["auth-provider"]), config
         elif "token" in user_config:
             print("✅ Using direct token")
             return {
                 "access_token": user_config["token"],
                 "token_type": "Bearer",
                 "source": "direct"
-            }
+            }, config
         else:
             print("❌ Unknown authentication method")
-            return None
+            return None, config
             
     except Exception as e:
         print(f"❌ Error reading kubeconfig: {e}")
-        return None
+        return None, None
 
 def get_token_with_kubelogin():
     """Get fresh token using kubelogin"""
     print("🔄 Getting fresh token with kubelogin...")
     
     try:
-        # Run kubelogin get-token
-        result = subprocess.run([
-            "kubelogin", "get-token",
-            "--login", "devicecode",
-            "--server-id", "kubernetes-oidc",
-            "--client-id", "kubernetes-oidc",
-            "--tenant-id", "itlusions"
-        ], capture_output=True, text=True, check=True)
+        # Run kubelogin get-token; the JSON parser takes the raw bytes without a str decode
+        result = subprocess.run(_KUBELOGIN_GET_TOKEN,
+                                capture_output=True, check=True)
         
-        token_data = json.loads(result.stdout)
+        token_data = _jloads(result.stdout)
         
         if "status" in token_data and "token" in token_data["status"]:
             return {
@@ -104,7 +155,7 @@ def get_token_with_kubelogin():
             
     except subprocess.CalledProcessError as e:
         print(f"❌ kubelogin failed: {e}")
-        print(f"stderr: {e.stderr}")
+        print(f"stderr: {e.stderr.decode(errors='replace') if e.stderr else ''}")
         return None
     except json.JSONDecodeError as e:
         print(f"❌ Failed to parse kubelogin output: {e}")
@@ -134,37 +185,61 @@ def save_token_info(token_info):
     
     # Save raw token
     if "access_token" in token_info:
-        token_file = os.path.expanduser("~/.kube/current-token.txt")
+        token_file = _TOKEN_FILE
         with open(token_file, "w") as f:
             f.write(token_info["access_token"])
         print(f"📁 Access token saved: {token_file}")
     
     # Save full token info as JSON
-    info_file = os.path.expanduser("~/.kube/current-token-info.json")
-    with open(info_file, "w") as f:
-        # Don't save the actual tokens in the info file for security
-        safe_info = {k: v for k, v in token_info.items() if "token" not in k.lower()}
-        safe_info["token_length"] = len(token_info.get("access_token", ""))
-        safe_info["has_refresh_token"] = "refresh_token" in token_info
-        json.dump(safe_info, f, indent=2, default=str)
+    info_file = _TOKEN_INFO_FILE
+    # Don't save the actual tokens in the info file for security
+    safe_info = {k: v for k, v in token_info.items() if k not in _SECRET_KEYS}
+    safe_info["token_length"] = len(token_info.get("access_token", ""))
+    safe_info["has_refresh_token"] = "refresh_token" in token_info
+    if orjson is not None:
+        with open(info_file, "wb") as f:
+            f.write(orjson.dumps(safe_info, option=orjson.OPT_INDENT_2, default=str))
+    else:
+        with open(info_file, "w") as f:
+            json.dump(safe_info, f, indent=2, default=str)
     print(f"📁 Token info saved: {info_file}")
 
-def create_bearer_token_kubeconfig(token_info):
+def get_cluster_info(config):
+    """Return the first cluster entry of a parsed minified kubeconfig"""
+    clusters = (config or {}).get("clusters") or [{}]
+    return clusters[0].get("cluster", {})
+
+def get_tls_verify(config):
+    """Return the requests ``verify`` value for the current cluster
+    
+    The CA data is decoded and written to a temp file only once per run.
+    """
+    cluster = get_cluster_info(config)
+    if cluster.get("insecure-skip-tls-verify"):
+        return False
+    
+    ca_b64 = cluster.get("certificate-authority-data")
+    if not ca_b64:
+        return True
+    
+    if ca_b64 not in _CA_BUNDLES:
+        fd, ca_path = tempfile.mkstemp(suffix=".crt")
+        with os.fdopen(fd, "wb") as f:
+            f.write(base64.b64decode(ca_b64))
+        atexit.register(os.remove, ca_path)
+        _CA_BUNDLES[ca_b64] = ca_path
+    return _CA_BUNDLES[ca_b64]
+
+def create_bearer_token_kubeconfig(token_info, config):
     """Create a kubeconfig using the bearer token"""
     if not token_info or "access_token" not in token_info:
         return None
     
     try:
         # Get cluster info
-        cluster_url = subprocess.check_output([
-            "kubectl", "config", "view", "--minify",
-            "-o", "jsonpath={.clusters[0].cluster.server}"
-        ], text=True).strip()
-        
-        cluster_ca = subprocess.check_output([
-            "kubectl", "config", "view", "--raw", "--minify", "--flatten",
-            "-o", "jsonpath={.clusters[0].cluster.certificate-authority-data}"
-        ], text=True).strip()
+        cluster = get_cluster_info(config)
+        cluster_url = cluster["server"]
+        cluster_ca = cluster.get("certificate-authority-data", "")
         
         kubeconfig = {
             "apiVersion": "v1",
@@ -192,42 +267,39 @@ def create_bearer_token_kubeconfig(token_info):
             "current-context": "current-token-context"
         }
         
-        config_path = os.path.expanduser("~/.kube/config-current-token")
+        # kubectl reads JSON kubeconfigs as-is, and json is much cheaper than yaml.dump
+        config_path = _BEARER_KUBECONFIG_FILE
         with open(config_path, "w") as f:
-            yaml.dump(kubeconfig, f, default_flow_style=False)
+            json.dump(kubeconfig, f, indent=2)
         
         print(f"📁 Bearer token kubeconfig created: {config_path}")
         return config_path
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Failed to get cluster info: {e}")
+    except KeyError as e:
+        print(f"❌ Failed to get cluster info: missing {e}")
         return None
 
-def test_token(token_info):
+def test_token(token_info, config):
     """Test the token by making a simple API call"""
     if not token_info or "access_token" not in token_info:
         return False
     
     try:
         # Get API server URL
-        api_server = subprocess.check_output([
-            "kubectl", "config", "view", "--minify",
-            "-o", "jsonpath={.clusters[0].cluster.server}"
-        ], text=True).strip()
+        api_server = get_cluster_info(config)["server"]
         
-        import requests
         headers = {
-            "Authorization": f"Bearer {token_info['access_token']}",
-            "Accept": "application/json"
+            "Authorization": f"Bearer {token_info['access_token']}"
         }
         
         # Test with /api/v1/namespaces (should be accessible to most users)
-        response = requests.get(f"{api_server}/api/v1/namespaces", 
-                              headers=headers, verify=False, timeout=10)
+        response = _get_session().get(f"{api_server}/api/v1/namespaces", 
+                                      headers=headers, verify=get_tls_verify(config),
+                                      timeout=10)
         
         if response.status_code == 200:
             print("✅ Token test successful!")
-            namespaces = response.json().get("items", [])
+            namespaces = _jloads(response.content).get("items", [])
             print(f"   Found {len(namespaces)} namespaces")
             return True
         else:
@@ -240,10 +312,10 @@ def test_token(token_info):
 
 def main():
     print("🔑 Current User OIDC Token Generator")
-    print("=" * 50)
+    print(_SEP50)
     
     # Get current token
-    token_info = get_current_oidc_token()
+    token_info, config = get_current_oidc_token()
     
     if not token_info:
         print("❌ Failed to get token information")
@@ -263,11 +335,11 @@ def main():
     save_token_info(token_info)
     
     # Create kubeconfig
-    config_path = create_bearer_token_kubeconfig(token_info)
+    config_path = create_bearer_token_kubeconfig(token_info, config)
     
     # Test token
     print("\n🧪 Testing token...")
-    test_token(token_info)
+    test_token(token_info, config)
     
     print("\n🎉 Token extraction complete!")
     print("\n📋 Usage examples:")
@@ -18,59 +18,62 @@ class KubernetesTokenManager:
         """Create a persistent service account with token"""
         print(f"🔑 Creating service account: {sa_name}")
         
-        # Create service account
-        subprocess.run([
-            "kubectl", "create", "serviceaccount", sa_name, "-n", namespace
-        ], check=True)
-        
-        # Create cluster role binding
-        subprocess.run([
-            "kubectl", "create", "clusterrolebinding", f"{sa_name}-binding",
-            "--clusterrole=cluster-admin",
-            f"--serviceaccount={namespace}:{sa_name}"
-        ], check=True)
-        
-        # Create token secret
-        secret_yaml = f"""
-apiVersion: v1
-kind: Secret
-metadata:
-  name: {sa_name}-token
-  namespace: {namespace}
-  annotations:
-    kubernetes.io/service-account.name: {sa_name}
-type: kubernetes.io/service-account-token
-"""
-        
-        with open("/tmp/token-secret.yaml", "w") as f:
-            f.write(secret_yaml)
-        
-        subprocess.run(["kubectl", "apply", "-f", "/tmp/token-secret.yaml"], check=True)
-        
-        # Wait and extract token
-        import time
-        time.sleep(5)
-        
-        token_result = subprocess.run([
-            "kubectl", "get", "secret", f"{sa_name}-token", "-n", namespace,
-            "-o", "jsonpath={.data.token}"
-        ], capture_output=True, text=True, check=True)
-        
-        token = base64.b64decode(token_result.stdout).decode('utf-8')
-        
-        ca_result = subprocess.run([
-            "kubectl", "get", "secret", f"{sa_name}-token", "-n", namespace,
-            "-o", "jsonpath={.data.ca\\.crt}"
-        ], capture_output=True, text=True, check=True)
-        
-        ca_cert = ca_result.stdout
-        
-        cluster_result = subprocess.run([
-            "kubectl", "config", "view", "--minify",
-            "-o", "jsonpath={.clusters[0].cluster.server}"
-        ], capture_output=True, text=True, check=True)
+        # Talk to the API server directly: one pooled connection instead of a
+        # kubectl process (and kubeconfig parse + TLS handshake) per step
+        from kubernetes import client, config, watch
+        
+        config.load_kube_config()
+        with client.ApiClient() as api_client:
+            v1 = client.CoreV1Api(api_client)
+            rbac = client.RbacAuthorizationV1Api(api_client)
+            
+            # Create service account
+            v1.create_namespaced_service_account(namespace, {
+                "metadata": {"name": sa_name}
+            })
+            
+            # Create cluster role binding
+            rbac.create_cluster_role_binding({
+                "metadata": {"name": f"{sa_name}-binding"},
+                "roleRef": {
+                    "apiGroup": "rbac.authorization.k8s.io",
+                    "kind": "ClusterRole",
+                    "name": "cluster-admin"
+                },
+                "subjects": [{
+                    "kind": "ServiceAccount",
+                    "name": sa_name,
+                    "namespace": namespace
+                }]
+            })
+            
+            # Create token secret
+            v1.create_namespaced_secret(namespace, {
+                "metadata": {
+                    "name": f"{sa_name}-token",
+                    "annotations": {"kubernetes.io/service-account.name": sa_name}
+                },
+                "type": "kubernetes.io/service-account-token"
+            })
+            
+            # Wait for the token controller to populate the secret; the watch
+            # returns as soon as it does instead of sleeping a fixed interval
+            secret = None
+            secret_watch = watch.Watch()
+            for event in secret_watch.stream(v1.list_namespaced_secret, namespace,
+                                             field_selector=f"metadata.name={sa_name}-token",
+                                             timeout_seconds=10):
+                if (event["object"].data or {}).get("token"):
+                    secret = event["object"]
+                    secret_watch.stop()
+                    break
+            
+            if secret is None:
+                raise RuntimeError(f"Timed out waiting for a token in secret {sa_name}-token")
+            cluster_url = api_client.configuration.host
         
-        cluster_url = cluster_result.stdout
+        token = base64.b64decode(secret.data["token"]).decode('utf-8')
+        ca_cert = secret.data["ca.crt"]
         
         return {
             "token": token,
@@ -111,7 +114,8 @@ type: kubernetes.io/service-account-token
         
         config_path = f"{os.path.expanduser('~')}/.kube/config-persistent"
         with open(config_path, "w") as f:
-            yaml.dump(config, f, default_flow_style=False)
+            yaml.dump(config, f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+                      default_flow_style=False)
         
         print(f"✅ Persistent kubeconfig created: {config_path}")
         print(f"🔧 To use: export KUBECONFIG={config_path}")
@@ -121,10 +125,10 @@ type: kubernetes.io/service-account-token
         """Extract OIDC token information from current kubeconfig"""
         try:
             result = subprocess.run([
-                "kubectl", "config", "view", "--context=oidc-context", "--raw"
-            ], capture_output=True, text=True, check=True)
+                "kubectl", "config", "view", "--context=oidc-context", "--raw", "-o", "json"
+            ], capture_output=True, check=True)
             
-            config = yaml.safe_load(result.stdout)
+            config = json.loads(result.stdout)
             
             for user in config.get("users", []):
                 if user["name"] == "oidc-user":
@@ -169,7 +173,9 @@ Enter choice (1-3): """).strip()
             print(f"📁 Config: {config_path}")
             print(f"🧪 Test: KUBECONFIG={config_path} kubectl get nodes")
             
-        except subprocess.CalledProcessError as e:
+        except ImportError:
+            print("❌ The kubernetes package is required: pip install 'itlc[scripts]'")
+        except Exception as e:
             print(f"❌ Error creating service account token: {e}")
     
     if choice in ["2", "3"]:
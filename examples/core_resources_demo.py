@@ -6,10 +6,28 @@ Demonstrates creating tenants, subscriptions, resource groups, and querying loca
 using the ITL Control Plane API Gateway.
 """
 import subprocess
-import json
 import os
 import sys
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Run itlc in-process when the package is importable to skip interpreter startup
+try:
+    from click.testing import CliRunner
+    from itlc.__main__ import cli as itlc_cli
+except ImportError:
+    CliRunner = None
+    itlc_cli = None
+
+# CliRunner swaps the process-wide stdio streams, so invocations must not overlap
+_cli_runner = CliRunner() if CliRunner else None
+_cli_lock = threading.Lock()
 
 
 class Colors:
@@ -21,21 +39,62 @@ class Colors:
     END = '\033[0m'
 
 
+# Pre-built message decorations
+_STEP_PREFIX = f"{Colors.CYAN}==>{Colors.END} {Colors.BOLD}"
+_STEP_SUFFIX = Colors.END
+_SUCCESS_PREFIX = f"{Colors.GREEN}✓{Colors.END} "
+_ERROR_PREFIX = f"{Colors.RED}✗{Colors.END} "
+
+
+def _emit(prefix: str, msg: str, suffix: str = '', file=None):
+    print(prefix + msg + suffix, file=file)
+
+
 def print_step(msg: str):
-    print(f"{Colors.CYAN}==>{Colors.END} {Colors.BOLD}{msg}{Colors.END}")
+    _emit(_STEP_PREFIX, msg, _STEP_SUFFIX)
 
 
 def print_success(msg: str):
-    print(f"{Colors.GREEN}✓{Colors.END} {msg}")
+    _emit(_SUCCESS_PREFIX, msg)
 
 
 def print_error(msg: str):
-    print(f"{Colors.RED}✗{Colors.END} {msg}", file=sys.stderr)
+    _emit(_ERROR_PREFIX, msg, file=sys.stderr)
+
+
+def invoke_itlc(args: list):
+    """Invoke the itlc click entry point directly, returning the result on success"""
+    with _cli_lock:
+        # Echo under the lock too: another thread's invoke may have swapped sys.stdout
+        print(f"  $ itlc {' '.join(args)}")
+        result = _cli_runner.invoke(itlc_cli, args)
+    
+    if result.exit_code != 0:
+        print_error(f"Command failed with exit code {result.exit_code}")
+        if result.output:
+            print(result.output)
+        return None
+    return result
+
+
+def run_itlc_in_process(args: list, capture_output: bool = True) -> Optional[str]:
+    """Invoke the itlc click entry point directly and return its output"""
+    result = invoke_itlc(args)
+    if result is None:
+        return None
+    
+    if capture_output:
+        return result.stdout.strip()
+    print(result.output, end='')
+    return None
 
 
 def run_command(cmd: list, capture_output: bool = True) -> Optional[str]:
     """Run CLI command and return output"""
     try:
+        if itlc_cli is not None and cmd[0] == 'itlc':
+            return run_itlc_in_process(cmd[1:], capture_output)
+        
         print(f"  $ {' '.join(cmd)}")
         result = subprocess.run(
             cmd,
@@ -51,6 +110,36 @@ def run_command(cmd: list, capture_output: bool = True) -> Optional[str]:
         return None
 
 
+def run_command_json(cmd: list, in_process: bool = True) -> Optional[Any]:
+    """Run CLI command and parse its JSON output straight from the raw bytes
+    
+    In-process calls run one at a time; pass in_process=False for calls made
+    concurrently so each runs in its own itlc process.
+    """
+    try:
+        if itlc_cli is not None and cmd[0] == 'itlc':
+            if in_process:
+                result = invoke_itlc(cmd[1:])
+                if result is None:
+                    return None
+                raw = result.stdout_bytes
+                return json_loads(raw) if raw.strip() else None
+            cmd = [sys.executable, '-m', 'itlc', *cmd[1:]]
+        
+        print(f"  $ {' '.join(cmd)}")
+        raw = subprocess.run(cmd, capture_output=True, check=True).stdout
+        
+        return json_loads(raw) if raw.strip() else None
+    except subprocess.CalledProcessError as e:
+        print_error(f"Command failed: {e}")
+        if e.stderr:
+            print(e.stderr.decode(errors='replace'))
+        return None
+    except ValueError as e:
+        print_error(f"Invalid JSON output: {e}")
+        return None
+
+
 def main():
     """Main workflow: Setup and manage Core resources"""
     
@@ -96,9 +185,8 @@ def main():
     
     # Step 2: List available locations
     print_step("Step 2: List available locations")
-    locations_json = run_command(['itlc', 'location', 'list', '--output', 'json'])
-    if locations_json:
-        locations = json.loads(locations_json)
+    locations = run_command_json(['itlc', 'location', 'list', '--output', 'json'])
+    if locations:
         location_list = locations.get('value', [])
         print_success(f"Found {len(location_list)} locations")
         for loc in location_list[:3]:  # Show first 3
@@ -109,7 +197,7 @@ def main():
     # Step 3: Create a tenant
     print_step("Step 3: Create tenant")
     tenant_name = "demo-tenant-001"
-    tenant_json = run_command([
+    tenant = run_command_json([
         'itlc', 'tenant', 'create', tenant_name,
         '--display-name', 'Demo Tenant',
         '--domain', 'demo.example.com',
@@ -119,8 +207,7 @@ def main():
         '--output', 'json'
     ])
     
-    if tenant_json:
-        tenant = json.loads(tenant_json)
+    if tenant:
         tenant_id = tenant.get('id')
         print_success(f"Tenant created: {tenant_id}")
     else:
@@ -130,7 +217,7 @@ def main():
     # Step 4: Create a subscription
     print_step("Step 4: Create subscription")
     subscription_name = "demo-subscription-001"
-    subscription_json = run_command([
+    subscription = run_command_json([
         'itlc', 'subscription', 'create', subscription_name,
         '--display-name', 'Demo Subscription',
         '--tenant-id', tenant_id,
@@ -140,8 +227,7 @@ def main():
         '--output', 'json'
     ])
     
-    if subscription_json:
-        subscription = json.loads(subscription_json)
+    if subscription:
         subscription_id = subscription.get('name')  # Use name as ID
         print_success(f"Subscription created: {subscription.get('id')}")
     else:
@@ -156,18 +242,24 @@ def main():
         ('network-rg', 'Network Resources')
     ]
     
-    created_rgs = []
-    for rg_name, description in resource_groups:
-        rg_json = run_command([
+    def create_resource_group(rg):
+        rg_name, description = rg
+        return run_command_json([
             'itlc', 'resourcegroup', 'create', rg_name, subscription_id,
             '--location', 'westeurope',
             '--tag', f'description={description}',
             '--tag', 'managed-by=itlc',
             '--output', 'json'
-        ])
-        
-        if rg_json:
-            rg = json.loads(rg_json)
+        ], in_process=False)
+    
+    # Resource groups are independent, so create them concurrently, each in its
+    # own process (in-process invocations share stdio and run one at a time)
+    with ThreadPoolExecutor(max_workers=min(8, len(resource_groups))) as executor:
+        rg_results = list(executor.map(create_resource_group, resource_groups))
+    
+    created_rgs = []
+    for (rg_name, _), rg in zip(resource_groups, rg_results):
+        if rg:
             created_rgs.append(rg)
             print_success(f"Resource group created: {rg_name}")
         else:
@@ -4,17 +4,18 @@ Setup script for kubectl-oidc-setup package
 """
 
 from setuptools import setup, find_packages
+import ast
 import os
-import re
 
 # Read version from __init__.py
 def get_version():
+    # Parse rather than import: importing itlc would pull in its runtime dependencies
     init_path = os.path.join('src', 'itlc', '__init__.py')
+    # Stop at the version line instead of parsing the whole module
     with open(init_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    version_match = re.search(r'^__version__ = [\'"]([^\'"]*)[\'"]', content, re.MULTILINE)
-    if version_match:
-        return version_match.group(1)
+        for line in f:
+            if line.startswith('__version__'):
+                return ast.literal_eval(line.split('=', 1)[1].strip())
     raise RuntimeError('Unable to find version string.')
 
 # Read README
@@ -67,10 +68,21 @@ setup(
             'flake8>=3.8',
             'mypy>=0.900',
         ],
+        'fast': [
+            'orjson>=3.6',
+        ],
+        'verify': [
+            'PyJWT[crypto]>=2.4.0',
+        ],
+        'scripts': [
+            'requests>=2.25.0',
+            'kubernetes>=24.2.0',
+        ],
     },
     entry_points={
         'console_scripts': [
             'itlc=itlc.__main__:cli',
+            'itlc-agent=itlc.token_agent:main',
         ],
     },
     include_package_data=True,
@@ -7,13 +7,43 @@ __version__ = "1.0.0"
 __author__ = "ITlusions"
 __description__ = "Keycloak API Token Management CLI"
 
+import importlib
+
+# Imported eagerly: the shared instance has the same name as its submodule, and
+# any later `from .token_cache import ...` would otherwise leave itlc.token_cache
+# bound to the module instead. The module is stdlib-only and cheap to load.
 from .token_cache import TokenCache, token_cache
-from .keycloak_client import KeycloakClient
-from .interactive_auth import InteractiveAuth
-from .controlplane_client import ControlPlaneClient
-from .server_onboarding import ServerOnboardingClient
-from .kubectl_oidc_setup import KubectlOIDCSetup
-from .oidc_auth import OIDCConfig, get_oidc_token, output_credential
+
+# Other public names and the submodules defining them. They are imported on
+# first access (PEP 562), so `python -m itlc.oidc_auth`, which kubectl runs for
+# every command, does not load requests and the management clients with it.
+_LAZY_ATTRIBUTES = {
+    'KeycloakClient': 'keycloak_client',
+    'InteractiveAuth': 'interactive_auth',
+    'ControlPlaneClient': 'controlplane_client',
+    'ServerOnboardingClient': 'server_onboarding',
+    'KubectlOIDCSetup': 'kubectl_oidc_setup',
+    'OIDCConfig': 'oidc_auth',
+    'get_oidc_token': 'oidc_auth',
+    'output_credential': 'oidc_auth',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f'.{module_name}', __name__)
+    # Bind every name from the module at once
+    for attribute, source in _LAZY_ATTRIBUTES.items():
+        if source == module_name:
+            globals()[attribute] = getattr(module, attribute)
+    return globals()[name]
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 
 __all__ = [
     'TokenCache', 
@@ -40,6 +40,15 @@ class Colors:
     END = '\033[0m'
 
 
+def get_keycloak_settings():
+    """Return (keycloak_url, realm) from the environment, with ITL defaults"""
+    env = os.environ
+    return (
+        env.get('KEYCLOAK_URL', 'https://sts.itlusions.com'),
+        env.get('KEYCLOAK_REALM', 'itlusions'),
+    )
+
+
 def print_banner():
     """Print ASCII banner"""
     click.echo(f"{Colors.CYAN}{ASCII_BANNER}{Colors.END}")
@@ -330,10 +339,11 @@ def config():
     click.echo(f"\n{Colors.BOLD}ITL Token Manager Configuration:{Colors.END}\n")
     
     # Environment variables
-    click.echo(f"Keycloak URL: {os.getenv('KEYCLOAK_URL', 'Not set (default: https://sts.itlusions.com)')}")
-    click.echo(f"Keycloak Realm: {os.getenv('KEYCLOAK_REALM', 'Not set (default: itlusions)')}")
-    click.echo(f"Client ID: {os.getenv('KEYCLOAK_CLIENT_ID') or os.getenv('ITL_CLIENT_ID', 'Not set')}")
-    click.echo(f"Client Secret: {'***' if (os.getenv('KEYCLOAK_CLIENT_SECRET') or os.getenv('ITL_CLIENT_SECRET')) else 'Not set'}")
+    env = os.environ
+    click.echo(f"Keycloak URL: {env.get('KEYCLOAK_URL', 'Not set (default: https://sts.itlusions.com)')}")
+    click.echo(f"Keycloak Realm: {env.get('KEYCLOAK_REALM', 'Not set (default: itlusions)')}")
+    click.echo(f"Client ID: {env.get('KEYCLOAK_CLIENT_ID') or env.get('ITL_CLIENT_ID', 'Not set')}")
+    click.echo(f"Client Secret: {'***' if (env.get('KEYCLOAK_CLIENT_SECRET') or env.get('ITL_CLIENT_SECRET')) else 'Not set'}")
     
     # Cache directory
     cache_dir = token_cache.cache_dir
@@ -341,12 +351,12 @@ def config():
     click.echo(f"Cache Exists: {cache_dir.exists()}")
     
     if cache_dir.exists():
-        cache_files = list(cache_dir.glob('*.json'))
-        click.echo(f"Cached Tokens: {len(cache_files)}")
+        cached_tokens = token_cache.list_cached()
+        click.echo(f"Cached Tokens: {len(cached_tokens)}")
         
-        if cache_files:
+        if cached_tokens:
             click.echo(f"\n{Colors.BOLD}Cached Tokens:{Colors.END}")
-            for cached in token_cache.list_cached():
+            for cached in cached_tokens:
                 click.echo(f"  • {cached['client_id']} (expires: {cached['expires_at']})")
 
 
@@ -400,8 +410,9 @@ def login(realm, keycloak_url):
         itlc login --keycloak-url=https://auth.example.com
     """
     try:
-        keycloak_url = keycloak_url or os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        realm = realm or os.getenv('KEYCLOAK_REALM', 'itlusions')
+        env_url, env_realm = get_keycloak_settings()
+        keycloak_url = keycloak_url or env_url
+        realm = realm or env_realm
         
         auth = InteractiveAuth(keycloak_url, realm)
         token_response = auth.login(realm)
@@ -444,8 +455,7 @@ def realm_list():
         itlc realm list
     """
     try:
-        keycloak_url = os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        realm_name = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        keycloak_url, realm_name = get_keycloak_settings()
         
         auth = InteractiveAuth(keycloak_url, realm_name)
         realms = auth.list_realms()
@@ -482,8 +492,9 @@ def realm_discover(server):
         itlc realm discover --server https://sts.yourcompany.com
     """
     try:
-        keycloak_url = server or os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        current_realm = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        env_url, env_realm = get_keycloak_settings()
+        keycloak_url = server or env_url
+        current_realm = env_realm
         
         auth = InteractiveAuth(keycloak_url, current_realm)
         discovered = auth.discover_realms(keycloak_url)
@@ -538,8 +549,7 @@ def realm_set(realm_name):
         itlc realm set production
     """
     try:
-        keycloak_url = os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        current_realm = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        keycloak_url, current_realm = get_keycloak_settings()
         
         auth = InteractiveAuth(keycloak_url, current_realm)
         
@@ -564,8 +574,7 @@ def realm_show():
         itlc realm show
     """
     try:
-        keycloak_url = os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        current_realm = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        keycloak_url, current_realm = get_keycloak_settings()
         
         auth = InteractiveAuth(keycloak_url, current_realm)
         context = auth.get_context()
@@ -596,8 +605,7 @@ def whoami():
         itlc whoami
     """
     try:
-        keycloak_url = os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        realm = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        keycloak_url, realm = get_keycloak_settings()
         
         auth = InteractiveAuth(keycloak_url, realm)
         context = auth.get_context()
@@ -640,8 +648,7 @@ def logout():
         itlc logout
     """
     try:
-        keycloak_url = os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
-        realm = os.getenv('KEYCLOAK_REALM', 'itlusions')
+        keycloak_url, realm = get_keycloak_settings()
         
         auth = InteractiveAuth(keycloak_url, realm)
         auth.clear_context()
@@ -787,6 +794,20 @@ def configure_oidc(python_only, cluster_name, server, no_test):
         sys.exit(1)
 
 
+@cli.command()
+def agent():
+    """
+    Run the OIDC token agent in the foreground.
+    
+    Holds the kubectl OIDC token, the issuer's discovery document and its
+    HTTP connection in one long-lived process, so each kubectl command is
+    answered over a local socket instead of starting a new plugin process
+    that re-reads the cache and reconnects to refresh. Same as itlc-agent.
+    """
+    from .token_agent import main as agent_main
+    agent_main()
+
+
 # Register command groups with main CLI
 cli.add_command(cluster)
 cli.add_command(configure)
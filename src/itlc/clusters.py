@@ -4,19 +4,24 @@ Cluster Management for ITL CLI
 Manages registered clusters separate from OIDC authentication contexts.
 """
 import json
-import yaml
+import os
 from pathlib import Path
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 
+from .paths import get_itl_dir
+
+
+# Parsed registries by path, keyed on (st_mtime_ns, st_size) so an edit on disk invalidates them
+_clusters_cache: Dict[Path, Any] = {}
+
 
 class ClustersManager:
     """Manages registered ITL clusters"""
     
     def __init__(self):
-        self.config_dir = Path.home() / '.itl' / 'clusters'
+        self.config_dir = get_itl_dir('clusters')
         self.clusters_file = self.config_dir / 'clusters.yaml'
-        self.config_dir.mkdir(parents=True, exist_ok=True)
         
         # Reserved context names that should not be used for cluster names
         self.reserved_contexts = {
@@ -30,20 +35,55 @@ class ClustersManager:
     
     def load_clusters(self) -> Dict[str, Any]:
         """Load clusters from configuration file"""
-        if not self.clusters_file.exists():
+        try:
+            f = open(self.clusters_file, 'rb')
+        except FileNotFoundError:
             return {'clusters': {}}
         
-        with open(self.clusters_file, 'r') as f:
+        with f:
+            st = os.fstat(f.fileno())
+            key = (st.st_mtime_ns, st.st_size)
+            cached = _clusters_cache.get(self.clusters_file)
+            if cached and cached[0] == key:
+                return cached[1]
+            
+            # Deferred so commands that never touch the registry skip loading PyYAML
+            import yaml
+            
             try:
-                data = yaml.safe_load(f)
-                return data if data else {'clusters': {}}
+                data = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
             except Exception:
                 return {'clusters': {}}
+        
+        data = data if data else {'clusters': {}}
+        _clusters_cache[self.clusters_file] = (key, data)
+        return data
     
     def save_clusters(self, data: Dict[str, Any]) -> None:
         """Save clusters to configuration file"""
-        with open(self.clusters_file, 'w') as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+        import tempfile
+        import yaml
+        
+        # Callers mutate the loaded dict before saving, so drop it until the write lands
+        _clusters_cache.pop(self.clusters_file, None)
+        
+        # Write beside the registry and rename over it, so a concurrent reader
+        # sees either the old file or the new one, never a partial write
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix='.clusters-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                yaml.dump(data, f, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+                          default_flow_style=False, sort_keys=False)
+                f.flush()
+                st = os.fstat(f.fileno())
+            os.replace(tmp_path, self.clusters_file)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        _clusters_cache[self.clusters_file] = ((st.st_mtime_ns, st.st_size), data)
     
     def add_cluster(self, name: str, server: str, environment: str = 'production',
                    location: str = 'cloud', metadata: Optional[Dict] = None) -> None:
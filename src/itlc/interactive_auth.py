@@ -3,6 +3,7 @@ Interactive Authentication Module
 Azure CLI-style browser-based login with PKCE flow
 """
 import hashlib
+import hmac
 import base64
 import secrets
 import webbrowser
@@ -10,25 +11,40 @@ import json
 import os
 import requests
 from http.server import HTTPServer, BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs, urlencode
-from pathlib import Path
+from urllib.parse import urlparse, urlsplit, parse_qs, urlencode
 from typing import Optional, Dict, List
 import threading
 import time
 
+from .paths import get_itl_dir
+
 
 class CallbackHandler(BaseHTTPRequestHandler):
     """HTTP handler for OAuth callback"""
     
     auth_code = None
+    error = None  # Error reported by the identity provider for this login
+    expected_state = b""  # state sent with this login's authorization request
+    done = threading.Event()  # Set once a code or an error for this login has been received
     
     def do_GET(self):
         """Handle OAuth callback"""
         query = urlparse(self.path).query
         params = parse_qs(query)
         
-        if 'code' in params:
+        # Only accept a code issued for this login; constant-time comparison
+        state = params.get('state', [''])[0].encode()
+        state_ok = bool(CallbackHandler.expected_state) and hmac.compare_digest(state, CallbackHandler.expected_state)
+        
+        if state_ok and 'error' in params:
+            # The identity provider refused the login; report it instead of waiting
+            description = params.get('error_description', [''])[0]
+            CallbackHandler.error = f"{params['error'][0]}: {description}" if description else params['error'][0]
+            CallbackHandler.done.set()
+        
+        if 'code' in params and state_ok:
             CallbackHandler.auth_code = params['code'][0]
+            CallbackHandler.done.set()
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
             self.end_headers()
@@ -70,26 +86,54 @@ class InteractiveAuth:
         self.redirect_uri = f'http://localhost:{self.callback_port}/callback'
         
         # Context storage
-        self.context_dir = Path.home() / '.itl'
+        self.context_dir = get_itl_dir()
         self.context_file = self.context_dir / 'context.json'
-        self.context_dir.mkdir(parents=True, exist_ok=True)
+    
+    def _check_server_url(self, url: str) -> Optional[str]:
+        """Return the server URL without a trailing slash, or None if it is malformed.
+        
+        Checked before any network access so a mistyped URL fails at once
+        instead of after DNS and connect timeouts.
+        """
+        url = url.rstrip('/')
+        try:
+            parts = urlsplit(url)
+            valid = parts.scheme.lower() in ('http', 'https') and bool(parts.hostname)
+            parts.port  # Raises ValueError for a non-numeric or out-of-range port
+        except ValueError:
+            valid = False
+        if not valid:
+            print(f"[✗] Invalid Keycloak URL: {url!r} (expected http(s)://host[:port][/path])")
+            return None
+        return url
     
     def _generate_pkce_pair(self) -> tuple:
         """Generate PKCE code verifier and challenge"""
-        # Code verifier: 43-128 character random string
-        code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
+        # Code verifier: 43-128 character random string (kept as bytes for hashing)
+        code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).rstrip(b'=')
         
         # Code challenge: base64url(sha256(code_verifier))
-        challenge_bytes = hashlib.sha256(code_verifier.encode('utf-8')).digest()
-        code_challenge = base64.urlsafe_b64encode(challenge_bytes).decode('utf-8').rstrip('=')
+        code_challenge = base64.urlsafe_b64encode(hashlib.sha256(code_verifier).digest()).rstrip(b'=')
         
-        return code_verifier, code_challenge
+        return code_verifier.decode('ascii'), code_challenge.decode('ascii')
     
     def _start_callback_server(self) -> HTTPServer:
         """Start local HTTP server for OAuth callback"""
         server = HTTPServer(('localhost', self.callback_port), CallbackHandler)
         return server
     
+    def _wait_for_callback(self, server: HTTPServer, timeout: float = 300) -> bool:
+        """Answer callback requests until one ends this login; False on timeout"""
+        # A request with a wrong or missing state is refused and must not end the wait
+        deadline = time.monotonic() + timeout
+        while not CallbackHandler.done.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            server.timeout = remaining
+            server.handle_request()
+        return True
+    
     def login(self, realm: Optional[str] = None) -> Optional[Dict]:
         """
         Interactive login with browser.
@@ -103,10 +147,16 @@ class InteractiveAuth:
         if realm:
             self.realm = realm
         
+        keycloak_url = self._check_server_url(self.keycloak_url)
+        if not keycloak_url:
+            return None
+        self.keycloak_url = keycloak_url
+        
         print(f"[*] Starting interactive login for realm: {self.realm}")
         
-        # Generate PKCE pair
+        # Generate PKCE pair, and a state value that binds the callback to this login
         code_verifier, code_challenge = self._generate_pkce_pair()
+        state = secrets.token_urlsafe(24)
         
         # Build authorization URL
         auth_params = {
@@ -116,6 +166,7 @@ class InteractiveAuth:
             'scope': 'openid profile email',
             'code_challenge': code_challenge,
             'code_challenge_method': 'S256',
+            'state': state,
         }
         
         auth_url = (
@@ -124,10 +175,11 @@ class InteractiveAuth:
         )
         
         # Start callback server
+        CallbackHandler.auth_code = None
+        CallbackHandler.error = None
+        CallbackHandler.expected_state = state.encode()
+        CallbackHandler.done.clear()
         server = self._start_callback_server()
-        server_thread = threading.Thread(target=lambda: server.handle_request())
-        server_thread.daemon = True
-        server_thread.start()
         
         # Open browser
         print(f"[*] Opening browser for authentication...")
@@ -137,16 +189,16 @@ class InteractiveAuth:
         
         webbrowser.open(auth_url)
         
-        # Wait for callback
-        timeout = 300  # 5 minutes
-        start_time = time.time()
+        # Serve the callback on this thread (5 minutes)
+        if not self._wait_for_callback(server):
+            print("[✗] Login timeout. Please try again.")
+            server.server_close()
+            return None
         
-        while CallbackHandler.auth_code is None:
-            if time.time() - start_time > timeout:
-                print("[✗] Login timeout. Please try again.")
-                server.server_close()
-                return None
-            time.sleep(0.5)
+        if CallbackHandler.error:
+            print(f"[✗] Login failed: {CallbackHandler.error}")
+            server.server_close()
+            return None
         
         auth_code = CallbackHandler.auth_code
         CallbackHandler.auth_code = None  # Reset for next login
@@ -206,9 +258,6 @@ class InteractiveAuth:
     
     def get_context(self) -> Optional[Dict]:
         """Get saved authentication context"""
-        if not self.context_file.exists():
-            return None
-        
         try:
             with open(self.context_file, 'r') as f:
                 return json.load(f)
@@ -270,7 +319,9 @@ class InteractiveAuth:
             List of dictionaries with realm info (name, enabled status)
         """
         try:
-            url = keycloak_url or self.keycloak_url
+            url = self._check_server_url(keycloak_url or self.keycloak_url)
+            if not url:
+                return []
             
             # Try the realms endpoint (may require admin access on some Keycloak versions)
             realms_url = f"{url}/admin/realms"
@@ -14,6 +14,12 @@ class KeycloakClient:
     No Flask dependencies - works from CLI.
     """
     
+    # (client_id, client_secret) environment variable pairs, in priority order
+    _ENV_CREDENTIALS = (
+        ('KEYCLOAK_CLIENT_ID', 'KEYCLOAK_CLIENT_SECRET'),
+        ('ITL_CLIENT_ID', 'ITL_CLIENT_SECRET'),
+    )
+    
     def __init__(self, keycloak_url: str = None, realm: str = None):
         self.keycloak_url = keycloak_url or os.getenv('KEYCLOAK_URL', 'https://sts.itlusions.com')
         self.realm = realm or os.getenv('KEYCLOAK_REALM', 'itlusions')
@@ -100,35 +106,30 @@ class KeycloakClient:
         Returns:
             Dictionary with client_id and client_secret, or None
         """
-        # Try Keycloak-prefixed env vars
-        if os.getenv('KEYCLOAK_CLIENT_ID') and os.getenv('KEYCLOAK_CLIENT_SECRET'):
-            return {
-                'client_id': os.getenv('KEYCLOAK_CLIENT_ID'),
-                'client_secret': os.getenv('KEYCLOAK_CLIENT_SECRET'),
-                'source': 'environment'
-            }
-        
-        # Try ITL-prefixed env vars
-        if os.getenv('ITL_CLIENT_ID') and os.getenv('ITL_CLIENT_SECRET'):
-            return {
-                'client_id': os.getenv('ITL_CLIENT_ID'),
-                'client_secret': os.getenv('ITL_CLIENT_SECRET'),
-                'source': 'environment'
-            }
+        # Try Keycloak-prefixed, then ITL-prefixed env vars
+        env = os.environ
+        for id_key, secret_key in self._ENV_CREDENTIALS:
+            client_id = env.get(id_key)
+            client_secret = env.get(secret_key)
+            if client_id and client_secret:
+                return {
+                    'client_id': client_id,
+                    'client_secret': client_secret,
+                    'source': 'environment'
+                }
         
         # Try mounted secrets (Kubernetes)
         secret_path = Path('/etc/secrets/keycloak')
         client_id_file = secret_path / 'client-id'
         client_secret_file = secret_path / 'client-secret'
         
-        if client_id_file.exists() and client_secret_file.exists():
-            try:
-                return {
-                    'client_id': client_id_file.read_text().strip(),
-                    'client_secret': client_secret_file.read_text().strip(),
-                    'source': 'mounted_secrets'
-                }
-            except Exception:
-                pass
+        try:
+            return {
+                'client_id': client_id_file.read_text().strip(),
+                'client_secret': client_secret_file.read_text().strip(),
+                'source': 'mounted_secrets'
+            }
+        except Exception:
+            pass
         
         return None
@@ -7,17 +7,45 @@ for ITlusions Kubernetes clusters using Keycloak.
 """
 
 import os
+import re
+import hashlib
 import sys
 import subprocess
 import platform
-import urllib.request
-import zipfile
-import tarfile
-import json
+import urllib.parse
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Archive and HTTP modules (tarfile, zipfile, urllib.request, http.client) are
+# imported inside the install helpers, so `itlc --help`/`--version` and runs
+# where everything is already installed do not pay for loading them.
+
+# Host platform, probed once at import time
+SYSTEM = platform.system().lower()
+MACHINE = platform.machine().lower()
+
+# platform.machine() values mapped to Kubernetes release architecture names
+ARCH_MAP = {"x86_64": "amd64", "aarch64": "arm64", "armv7l": "arm"}
+
+# krew plugins required by the OIDC setup, installed with a single krew invocation
+KREW_PLUGINS = ("oidc-login",)
+
+# Kubernetes release download locations
+KUBECTL_RELEASE_URL = "https://dl.k8s.io/release"
+KUBECTL_STABLE_URL = f"{KUBECTL_RELEASE_URL}/stable.txt"
+
+# Read/write size for binary downloads; large chunks keep syscall counts low
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Downloaded binaries/archives kept between runs, revalidated with their ETag
+DOWNLOAD_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "itl-kubectl-oidc-setup"
+
+# Client version as printed by `kubectl version --client`, in both the current
+# "Client Version: v1.x.y" form and the older GitVersion:"v1.x.y" struct dump
+KUBECTL_VERSION_RE = re.compile(r"v\d+\.\d+\.\d+\S*?(?=[\s\"]|$)")
+
 
 class Colors:
     """ANSI color codes for terminal output."""
@@ -31,6 +59,35 @@ class Colors:
     END = '\033[0m'
 
 
+# Precomputed status prefixes, so call sites do not rebuild them on every print
+SUCCESS_PREFIX = f"{Colors.GREEN}✅ "
+ERROR_PREFIX = f"{Colors.RED}❌ "
+WARNING_PREFIX = f"{Colors.YELLOW}⚠️ "
+RESET = Colors.END
+
+
+def use_plain_output_if_piped():
+    """Drop the setup tool's colors when stdout is not a terminal (pipes, CI logs)."""
+    global SUCCESS_PREFIX, ERROR_PREFIX, WARNING_PREFIX, RESET
+    if sys.stdout is None or sys.stdout.isatty():
+        return
+    for name in ("GREEN", "YELLOW", "RED", "BLUE", "CYAN", "WHITE", "BOLD", "END"):
+        setattr(Colors, name, "")
+    SUCCESS_PREFIX, ERROR_PREFIX, WARNING_PREFIX, RESET = "✅ ", "❌ ", "⚠️ ", ""
+
+
+def print_success(msg):
+    print(f"{SUCCESS_PREFIX}{msg}{RESET}")
+
+
+def print_error(msg):
+    print(f"{ERROR_PREFIX}{msg}{RESET}")
+
+
+def print_warning(msg):
+    print(f"{WARNING_PREFIX}{msg}{RESET}")
+
+
 class KubectlOIDCSetup:
     """Main setup class for kubectl OIDC configuration."""
     
@@ -94,12 +151,13 @@ users:
 """
     
     def __init__(self):
-        self.system = platform.system().lower()
-        self.arch = platform.machine().lower()
+        self.system = SYSTEM
+        self.arch = MACHINE
         self.home_dir = Path.home()
         self.kubectl_dir = self.home_dir / ".kubectl"
         self.plugins_dir = self.kubectl_dir / "plugins"
         self.kubectl_exe = None  # Will store full path if manually installed
+        self._program_paths = {}  # program name -> absolute path found on PATH
         self.kubeconfig_path = self.home_dir / ".kube" / "config"
         
         # Default cluster config URL - Update this to your API endpoint
@@ -113,6 +171,23 @@ users:
             "username_claim": "preferred_username",
             "groups_claim": "groups"
         }
+        
+        # kubelogin exec arguments, built once from the OIDC configuration
+        self.oidc_exec_args = (
+            "oidc-login",
+            "get-token",
+            f"--oidc-issuer-url={self.oidc_config['issuer_url']}",
+            f"--oidc-client-id={self.oidc_config['client_id']}",
+            f"--oidc-extra-scope={self.oidc_config['extra_scopes']}",
+            f"--oidc-username-claim={self.oidc_config['username_claim']}",
+            f"--oidc-groups-claim={self.oidc_config['groups_claim']}"
+        )
+        self._set_credentials_args = (
+            "kubectl", "config", "set-credentials", "oidc-user",
+            "--exec-api-version=client.authentication.k8s.io/v1beta1",
+            "--exec-command=kubectl",
+            *(f"--exec-arg={arg}" for arg in self.oidc_exec_args)
+        )
 
     def print_header(self):
         """Print the tool header."""
@@ -123,49 +198,243 @@ users:
         print(f"{Colors.CYAN}Configuring kubectl OIDC authentication for ITlusions cluster{Colors.END}")
         print()
 
-    def run_command(self, command, check=True, capture_output=True):
-        """Run a shell command and return the result."""
+    def _download(self, url, dest, expected_sha256=None):
+        """Download a URL to a local file, reusing the cached copy if unchanged."""
+        import urllib.error
+        import urllib.request
+        
+        request = urllib.request.Request(url, headers=self._download_cache_headers(url))
+        try:
+            with urllib.request.urlopen(request) as response:
+                self._save_verified(response, dest, expected_sha256)
+                etag = response.headers.get("ETag")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            self._link_cached_verified(url, dest, expected_sha256)
+            return
+        
+        self._store_download_cache(url, dest, etag)
+
+    def _save_verified(self, response, dest, expected_sha256=None):
+        """Stream a response body to ``dest``, hashing it on the way when a checksum is expected."""
+        with open(dest, 'wb') as f:
+            if not expected_sha256:
+                shutil.copyfileobj(response, f, DOWNLOAD_CHUNK_SIZE)
+                return
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b''):
+                digest.update(chunk)
+                f.write(chunk)
+        self._check_sha256(digest, dest, expected_sha256)
+
+    def _link_cached_verified(self, url, dest, expected_sha256=None):
+        """Place the cached copy of a URL at ``dest``, checking it against ``expected_sha256``."""
+        cache_file = self._download_cache_paths(url)[0]
+        self._link_or_copy(cache_file, dest)
+        if expected_sha256:
+            digest = hashlib.sha256()
+            with open(dest, 'rb') as f:
+                for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            try:
+                self._check_sha256(digest, dest, expected_sha256)
+            except Exception:
+                cache_file.unlink(missing_ok=True)  # Never serve the bad copy again
+                raise
+
+    def _check_sha256(self, digest, dest, expected_sha256):
+        """Remove ``dest`` and raise if its digest does not match the published checksum."""
+        if digest.hexdigest() != expected_sha256.lower():
+            os.unlink(dest)
+            raise Exception(f"Checksum mismatch for {Path(dest).name}: expected {expected_sha256}")
+
+    def _download_cache_paths(self, url):
+        """Return the (file, ETag sidecar) cache paths for a download URL."""
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return DOWNLOAD_CACHE_DIR / key, DOWNLOAD_CACHE_DIR / f"{key}.etag"
+
+    def _download_cache_headers(self, url):
+        """Return conditional request headers when a cached copy of the URL exists."""
+        cache_file, etag_file = self._download_cache_paths(url)
+        try:
+            if cache_file.is_file():
+                return {"If-None-Match": etag_file.read_text().strip()}
+        except OSError:
+            pass
+        return {}
+
+    def _store_download_cache(self, url, src, etag, data=None):
+        """Keep a downloaded file (or ``data`` bytes) for conditional requests; failures are not fatal."""
+        if not etag:
+            return
+        
+        cache_file, etag_file = self._download_cache_paths(url)
+        tmp_path = None
+        try:
+            DOWNLOAD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=DOWNLOAD_CACHE_DIR)
+            try:
+                if data is not None:
+                    os.write(fd, data)
+            finally:
+                os.close(fd)
+            if data is None:
+                self._link_or_copy(src, tmp_path)
+            os.replace(tmp_path, cache_file)
+            etag_file.write_text(etag)
+        except OSError:
+            if tmp_path and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _link_or_copy(self, src, dst):
+        """Put a file's contents at dst, replacing it, without copying bytes where possible.
+        
+        A hard link shares the data outright; across filesystems shutil.copyfile
+        still copies inside the kernel (sendfile/fcopyfile) rather than in Python.
+        """
+        try:
+            os.unlink(dst)
+        except FileNotFoundError:
+            pass
         try:
-            if isinstance(command, str):
-                command = command.split()
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+
+    def _https_get(self, connections, url, headers=None, max_redirects=5):
+        """GET a URL over a per-host keep-alive connection, following redirects.
+        
+        ``connections`` maps host -> HTTPSConnection and is shared between calls
+        so consecutive requests to the same host reuse one TLS session. The
+        returned response must be read completely before the next request.
+        A 304 response is returned as-is when conditional ``headers`` are sent.
+        """
+        import http.client
+        
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            conn = connections.get(parts.netloc)
+            if conn is None:
+                conn = connections[parts.netloc] = http.client.HTTPSConnection(parts.netloc, timeout=60)
+            
+            conn.request("GET", f"{parts.path}?{parts.query}" if parts.query else parts.path,
+                         headers=headers or {})
+            response = conn.getresponse()
+            if response.status in (301, 302, 303, 307, 308):
+                response.read()  # Drain so the connection can be reused
+                url = urllib.parse.urljoin(url, response.getheader("Location"))
+                continue
+            if response.status != 200 and not (headers and response.status == 304):
+                response.read()
+                raise Exception(f"HTTP {response.status} while downloading {url}")
+            return response
+        
+        raise Exception(f"Too many redirects while downloading {url}")
+
+    def _download_kubectl(self, os_name, arch, dest, filename="kubectl"):
+        """Download the latest stable kubectl, sharing connections between requests."""
+        import urllib.request
+        
+        # dl.k8s.io publishes a SHA-256 next to every binary as <binary URL>.sha256
+        if urllib.request.getproxies().get("https"):
+            # http.client does not honour proxy settings; let urllib handle them
+            with urllib.request.urlopen(KUBECTL_STABLE_URL) as response:
+                version = response.read().decode().strip()
+            kubectl_url = f"{KUBECTL_RELEASE_URL}/{version}/bin/{os_name}/{arch}/{filename}"
+            with urllib.request.urlopen(f"{kubectl_url}.sha256") as response:
+                expected_sha256 = response.read().decode().split()[0]
+            self._download(kubectl_url, dest, expected_sha256)
+            return
+        
+        connections = {}
+        try:
+            with self._https_get(connections, KUBECTL_STABLE_URL) as response:
+                version = response.read().decode().strip()
+            
+            kubectl_url = f"{KUBECTL_RELEASE_URL}/{version}/bin/{os_name}/{arch}/{filename}"
+            with self._https_get(connections, f"{kubectl_url}.sha256") as response:
+                expected_sha256 = response.read().decode().split()[0]
+            
+            headers = self._download_cache_headers(kubectl_url)
+            with self._https_get(connections, kubectl_url, headers) as response:
+                if response.status == 304:
+                    response.read()
+                    self._link_cached_verified(kubectl_url, dest, expected_sha256)
+                    return
+                self._save_verified(response, dest, expected_sha256)
+                etag = response.getheader("ETag")
+            
+            self._store_download_cache(kubectl_url, dest, etag)
+        finally:
+            for conn in connections.values():
+                conn.close()
+
+    def run_command(self, command, check=True, capture_output=False, text=True):
+        """Run a command given as an argv sequence and return the result.
+        
+        Output goes straight to the terminal unless ``capture_output=True`` is
+        passed by callers that read it; ``text=False`` skips decoding it.
+        """
+        try:
+            command = list(command)
             
             # If we have a manually installed kubectl and command uses kubectl, use full path
             if self.kubectl_exe and command[0] == "kubectl":
                 command[0] = self.kubectl_exe
+            elif not os.path.dirname(command[0]):
+                # Search PATH once per program instead of on every spawn; misses
+                # are not remembered, as an install may still add the program
+                program = self._program_paths.get(command[0]) or shutil.which(command[0])
+                if program:
+                    self._program_paths[command[0]] = program
+                    command[0] = program
             
             result = subprocess.run(
                 command,
                 check=check,
                 capture_output=capture_output,
-                text=True
+                text=text
             )
             return result
         except subprocess.CalledProcessError as e:
             if check:
-                print(f"{Colors.RED}❌ Command failed: {' '.join(command)}{Colors.END}")
+                print_error(f"Command failed: {' '.join(command)}")
                 print(f"{Colors.RED}Error: {e.stderr if e.stderr else str(e)}{Colors.END}")
                 return None
             return e
         except FileNotFoundError:
-            print(f"{Colors.RED}❌ Command not found: {command[0]}{Colors.END}")
+            print_error(f"Command not found: {command[0]}")
             return None
 
-    def check_kubectl(self):
-        """Check if kubectl is installed and accessible."""
+    def check_kubectl(self, show_version=True):
+        """Check if kubectl is installed and accessible.
+        
+        Presence is answered with a PATH lookup; kubectl itself is only run
+        when the version should be reported.
+        """
         print(f"{Colors.YELLOW}🔍 Checking kubectl installation...{Colors.END}")
         
-        result = self.run_command("kubectl version --client --output=json", check=False)
+        kubectl_path = self.kubectl_exe if self.kubectl_exe and os.path.isfile(self.kubectl_exe) \
+            else shutil.which("kubectl")
+        if not kubectl_path:
+            print_error("kubectl not found")
+            return False
+        
+        if not show_version:
+            print_success("kubectl found")
+            return True
+        
+        result = self.run_command(["kubectl", "version", "--client"], check=False, capture_output=True)
         if result and result.returncode == 0:
-            try:
-                version_info = json.loads(result.stdout)
-                version = version_info.get("clientVersion", {}).get("gitVersion", "unknown")
-                print(f"{Colors.GREEN}✅ kubectl found (version: {version}){Colors.END}")
-                return True
-            except:
-                print(f"{Colors.GREEN}✅ kubectl found{Colors.END}")
-                return True
+            match = KUBECTL_VERSION_RE.search(result.stdout)
+            if match:
+                print_success(f"kubectl found (version: {match.group()})")
+            else:
+                print_success("kubectl found")
+            return True
         else:
-            print(f"{Colors.RED}❌ kubectl not found{Colors.END}")
+            print_error("kubectl not found")
             return False
 
     def install_kubectl(self):
@@ -179,16 +448,19 @@ users:
         elif self.system == "linux":
             return self._install_kubectl_linux()
         else:
-            print(f"{Colors.RED}❌ Unsupported operating system: {self.system}{Colors.END}")
+            print_error(f"Unsupported operating system: {self.system}")
             return False
 
     def _install_kubectl_windows(self):
         """Install kubectl on Windows."""
         try:
             # Try winget first
-            result = self.run_command("winget install -e --id Kubernetes.kubectl --silent", check=False)
+            result = self.run_command(
+                ["winget", "install", "-e", "--id", "Kubernetes.kubectl", "--silent"],
+                check=False
+            )
             if result and result.returncode == 0:
-                print(f"{Colors.GREEN}✅ kubectl installed via winget{Colors.END}")
+                print_success("kubectl installed via winget")
                 
                 # Wait a moment for winget to complete
                 import time
@@ -198,44 +470,49 @@ users:
                 self._refresh_windows_path()
                 
                 # Verify installation
-                if self.check_kubectl():
+                if self.check_kubectl(show_version=False):
                     return True
                 else:
-                    print(f"{Colors.YELLOW}⚠️ winget completed but kubectl not yet in PATH, falling back to manual install{Colors.END}")
+                    print_warning("winget completed but kubectl not yet in PATH, falling back to manual install")
             
             # Fallback to manual download
             print(f"{Colors.YELLOW}⬇️ Downloading kubectl manually...{Colors.END}")
-            url = "https://dl.k8s.io/release/stable.txt"
-            with urllib.request.urlopen(url) as response:
-                version = response.read().decode().strip()
-            
-            kubectl_url = f"https://dl.k8s.io/release/{version}/bin/windows/amd64/kubectl.exe"
             kubectl_path = self.kubectl_dir / "kubectl.exe"
             
             self.kubectl_dir.mkdir(exist_ok=True)
-            urllib.request.urlretrieve(kubectl_url, kubectl_path)
+            # Download to a fresh file and rename it into place: the first download
+            # is hard-linked into the download cache, so writing kubectl.exe in
+            # place would also overwrite the cached copy of the previous version
+            fd, tmp_name = tempfile.mkstemp(dir=self.kubectl_dir, prefix=".kubectl-", suffix=".exe")
+            os.close(fd)
+            try:
+                self._download_kubectl("windows", "amd64", tmp_name, "kubectl.exe")
+                os.replace(tmp_name, kubectl_path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
             
             # Add to current session PATH immediately
             kubectl_dir_str = str(self.kubectl_dir)
             current_path = os.environ.get("PATH", "")
             if kubectl_dir_str not in current_path:
                 os.environ["PATH"] = f"{kubectl_dir_str};{current_path}"
-                print(f"{Colors.GREEN}✅ Added {kubectl_dir_str} to PATH for this session{Colors.END}")
+                print_success(f"Added {kubectl_dir_str} to PATH for this session")
             
             # Add to user PATH permanently
             if self._add_to_user_path_permanently(kubectl_dir_str):
-                print(f"{Colors.GREEN}✅ kubectl will be available in all future terminals{Colors.END}")
+                print_success("kubectl will be available in all future terminals")
             else:
                 print(f"{Colors.YELLOW}💡 To use kubectl in new terminals, restart them or log off/on{Colors.END}")
             
             # Store kubectl path for use in subsequent commands
             self.kubectl_exe = str(kubectl_path)
             
-            print(f"{Colors.GREEN}✅ kubectl downloaded to {kubectl_path}{Colors.END}")
+            print_success(f"kubectl downloaded to {kubectl_path}")
             return True
             
         except Exception as e:
-            print(f"{Colors.RED}❌ Failed to install kubectl: {e}{Colors.END}")
+            print_error(f"Failed to install kubectl: {e}")
             return False
     
     def _refresh_windows_path(self):
@@ -294,167 +571,220 @@ users:
                 SMTO_ABORTIFHUNG, 5000, ctypes.byref(result)
             )
             
-            print(f"{Colors.GREEN}✅ Permanently added {directory} to user PATH{Colors.END}")
+            print_success(f"Permanently added {directory} to user PATH")
             return True
             
         except Exception as e:
-            print(f"{Colors.YELLOW}⚠️ Could not update PATH permanently: {e}{Colors.END}")
+            print_warning(f"Could not update PATH permanently: {e}")
             return False
 
     def _install_kubectl_macos(self):
         """Install kubectl on macOS."""
         try:
             # Try homebrew first
-            result = self.run_command("brew install kubectl", check=False)
+            result = self.run_command(["brew", "install", "kubectl"], check=False)
             if result and result.returncode == 0:
-                print(f"{Colors.GREEN}✅ kubectl installed via homebrew{Colors.END}")
+                print_success("kubectl installed via homebrew")
                 return True
             
             # Fallback to manual download
             return self._install_kubectl_unix("darwin", "amd64")
             
         except Exception as e:
-            print(f"{Colors.RED}❌ Failed to install kubectl: {e}{Colors.END}")
+            print_error(f"Failed to install kubectl: {e}")
             return False
 
     def _install_kubectl_linux(self):
         """Install kubectl on Linux."""
         try:
             # Determine architecture
-            arch_map = {"x86_64": "amd64", "aarch64": "arm64", "armv7l": "arm"}
-            arch = arch_map.get(self.arch, "amd64")
+            arch = ARCH_MAP.get(self.arch, "amd64")
             
             return self._install_kubectl_unix("linux", arch)
             
         except Exception as e:
-            print(f"{Colors.RED}❌ Failed to install kubectl: {e}{Colors.END}")
+            print_error(f"Failed to install kubectl: {e}")
             return False
 
     def _install_kubectl_unix(self, os_name, arch):
         """Install kubectl on Unix-like systems."""
         print(f"{Colors.YELLOW}⬇️ Downloading kubectl...{Colors.END}")
         
-        # Get latest version
-        url = "https://dl.k8s.io/release/stable.txt"
-        with urllib.request.urlopen(url) as response:
-            version = response.read().decode().strip()
-        
-        kubectl_url = f"https://dl.k8s.io/release/{version}/bin/{os_name}/{arch}/kubectl"
         kubectl_path = Path("/usr/local/bin/kubectl")
+        user_bin = self.home_dir / ".local" / "bin"
         
-        # Download to temp file first
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            urllib.request.urlretrieve(kubectl_url, tmp.name)
+        # Stage the download next to its final location so installing it is a
+        # rename within one filesystem rather than a copy of the whole binary
+        if os.access(kubectl_path.parent, os.W_OK):
+            staging_dir = kubectl_path.parent
+        else:
+            user_bin.mkdir(parents=True, exist_ok=True)
+            staging_dir = user_bin
+        
+        fd, tmp_name = tempfile.mkstemp(dir=staging_dir, prefix=".kubectl-")
+        os.close(fd)
+        try:
+            self._download_kubectl(os_name, arch, tmp_name)
+            os.chmod(tmp_name, 0o755)
+            
+            if staging_dir == kubectl_path.parent:
+                os.replace(tmp_name, kubectl_path)
+                print_success(f"kubectl installed to {kubectl_path}")
+                return True
             
             # Try to move to /usr/local/bin (requires sudo)
-            try:
-                result = self.run_command(f"sudo mv {tmp.name} {kubectl_path}", check=False)
-                if result and result.returncode == 0:
-                    self.run_command(f"sudo chmod +x {kubectl_path}")
-                    print(f"{Colors.GREEN}✅ kubectl installed to {kubectl_path}{Colors.END}")
-                    return True
-            except:
-                pass
+            result = self.run_command(["sudo", "mv", tmp_name, str(kubectl_path)], check=False)
+            if result and result.returncode == 0:
+                print_success(f"kubectl installed to {kubectl_path}")
+                return True
             
             # Fallback to user directory
-            user_bin = self.home_dir / ".local" / "bin"
-            user_bin.mkdir(parents=True, exist_ok=True)
             kubectl_user_path = user_bin / "kubectl"
+            os.replace(tmp_name, kubectl_user_path)
             
-            shutil.move(tmp.name, kubectl_user_path)
-            kubectl_user_path.chmod(0o755)
-            
-            print(f"{Colors.GREEN}✅ kubectl installed to {kubectl_user_path}{Colors.END}")
-            print(f"{Colors.YELLOW}⚠️ Add {user_bin} to your PATH if not already there{Colors.END}")
+            print_success(f"kubectl installed to {kubectl_user_path}")
+            print_warning(f"Add {user_bin} to your PATH if not already there")
             return True
+        finally:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
 
     def check_kubelogin(self):
         """Check if kubelogin plugin is installed."""
         print(f"{Colors.YELLOW}🔍 Checking kubelogin plugin...{Colors.END}")
         
-        result = self.run_command("kubectl plugin list", check=False)
-        if result and result.returncode == 0 and "oidc-login" in result.stdout:
-            print(f"{Colors.GREEN}✅ kubelogin plugin found{Colors.END}")
+        # kubectl resolves plugins as kubectl-<name> executables on PATH, so a
+        # PATH lookup answers this without kubectl scanning every PATH entry.
+        # A krew install only counts once ~/.krew/bin is on PATH: kubectl
+        # cannot run the plugin before that.
+        if shutil.which("kubectl-oidc_login"):
+            print_success("kubelogin plugin found")
             return True
         else:
-            print(f"{Colors.YELLOW}⚠️ kubelogin plugin not found{Colors.END}")
+            print_warning("kubelogin plugin not found")
             return False
 
-    def install_kubelogin(self):
-        """Install kubelogin plugin."""
+    def install_kubelogin(self, archive=None):
+        """Install kubelogin plugin.
+        
+        ``archive`` is an already downloaded release archive (see
+        ``_prefetch_kubelogin``); it is consumed either way.
+        """
         print(f"{Colors.YELLOW}📦 Installing kubelogin plugin...{Colors.END}")
         
-        # Try krew first
-        result = self.run_command("kubectl krew install oidc-login", check=False)
+        # Try krew first; all plugins go through one kubectl/krew index load.
+        # Output is captured (not decoded) so a missing krew falls back quietly.
+        result = self.run_command(["kubectl", "krew", "install", *KREW_PLUGINS], check=False,
+                                  capture_output=True, text=False)
         if result and result.returncode == 0:
-            print(f"{Colors.GREEN}✅ kubelogin installed via krew{Colors.END}")
+            print_success("kubelogin installed via krew")
+            if archive:
+                os.unlink(archive)
             return True
         
         # Manual installation
-        return self._install_kubelogin_manual()
+        return self._install_kubelogin_manual(archive)
+
+    def _kubelogin_release(self):
+        """Return (url, member, target name) of the kubelogin archive for this platform."""
+        version = "v1.35.2"  # Latest stable version
+        base_url = f"https://github.com/int128/kubelogin/releases/download/{version}"
+        
+        if self.system == "windows":
+            return f"{base_url}/kubelogin_windows_amd64.zip", "kubelogin.exe", "kubectl-oidc_login.exe"
+        elif self.system == "darwin":
+            # macOS uses arm64 for Apple Silicon, amd64 for Intel
+            arch = "arm64" if self.arch in ["arm64", "aarch64"] else "amd64"
+            return f"{base_url}/kubelogin_darwin_{arch}.zip", "kubelogin", "kubectl-oidc_login"
+        elif self.system == "linux":
+            arch = "arm64" if self.arch in ["arm64", "aarch64"] else "arm" if self.arch.startswith("arm") else "amd64"
+            return f"{base_url}/kubelogin_linux_{arch}.zip", "kubelogin", "kubectl-oidc_login"
+        return None
 
-    def _install_kubelogin_manual(self):
+    def _prefetch_kubelogin(self):
+        """Download the kubelogin archive ahead of installation; returns its path or None."""
+        release = self._kubelogin_release()
+        if not release:
+            return None
+        
+        fd, tmp_path = tempfile.mkstemp(suffix=".zip")
+        os.close(fd)
+        try:
+            self._download(release[0], tmp_path)
+            return tmp_path
+        except Exception:
+            # Installation downloads it again and reports the error
+            os.unlink(tmp_path)
+            return None
+
+    def _install_kubelogin_manual(self, archive=None):
         """Manually install kubelogin."""
         print(f"{Colors.YELLOW}⬇️ Downloading kubelogin manually...{Colors.END}")
         
         try:
-            version = "v1.35.2"  # Latest stable version
-            
-            if self.system == "windows":
-                url = f"https://github.com/int128/kubelogin/releases/download/{version}/kubelogin_windows_amd64.zip"
-                return self._download_and_extract_zip(url, "kubelogin.exe", "kubectl-oidc_login.exe")
-            elif self.system == "darwin":
-                # macOS uses arm64 for Apple Silicon, amd64 for Intel
-                arch = "arm64" if self.arch in ["arm64", "aarch64"] else "amd64"
-                url = f"https://github.com/int128/kubelogin/releases/download/{version}/kubelogin_darwin_{arch}.zip"
-                return self._download_and_extract_zip(url, "kubelogin", "kubectl-oidc_login")
-            elif self.system == "linux":
-                arch = "arm64" if self.arch in ["arm64", "aarch64"] else "arm" if self.arch.startswith("arm") else "amd64"
-                url = f"https://github.com/int128/kubelogin/releases/download/{version}/kubelogin_linux_{arch}.zip"
-                return self._download_and_extract_zip(url, "kubelogin", "kubectl-oidc_login")
+            release = self._kubelogin_release()
+            if release:
+                return self._download_and_extract_zip(*release, archive=archive)
             
         except Exception as e:
-            print(f"{Colors.RED}❌ Failed to install kubelogin: {e}{Colors.END}")
+            print_error(f"Failed to install kubelogin: {e}")
             return False
 
-    def _download_and_extract_zip(self, url, source_name, target_name):
-        """Download and extract ZIP file."""
+    def _download_and_extract_zip(self, url, source_name, target_name, archive=None):
+        """Download a ZIP file and extract only the needed member.
+        
+        A previously downloaded ``archive`` is used instead of ``url`` and removed afterwards.
+        """
         self.plugins_dir.mkdir(parents=True, exist_ok=True)
+        target_path = self.plugins_dir / target_name
         
-        with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp:
-            urllib.request.urlretrieve(url, tmp.name)
+        # ZIP needs random access to its central directory, so it is spooled to disk
+        if archive:
+            tmp_path = archive
+        else:
+            fd, tmp_path = tempfile.mkstemp(suffix=".zip")
+            os.close(fd)
+        try:
+            if not archive:
+                self._download(url, tmp_path)
             
-            with zipfile.ZipFile(tmp.name, 'r') as zip_file:
-                zip_file.extract(source_name, self.plugins_dir)
+            import zipfile
+            with zipfile.ZipFile(tmp_path, 'r') as zip_file:
+                try:
+                    member = zip_file.getinfo(source_name)
+                except KeyError:
+                    return False
                 
-            source_path = self.plugins_dir / source_name
-            target_path = self.plugins_dir / target_name
+                # Write the member straight to its final name instead of extract + rename
+                with zip_file.open(member) as src, open(target_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
             
-            if source_path.exists():
-                source_path.rename(target_path)
-                target_path.chmod(0o755)
-                print(f"{Colors.GREEN}✅ kubelogin installed to {target_path}{Colors.END}")
-                return True
-            
-        return False
+            target_path.chmod(0o755)
+            print_success(f"kubelogin installed to {target_path}")
+            return True
+        finally:
+            os.unlink(tmp_path)
 
     def _download_and_extract_tar(self, url, source_name, target_name):
-        """Download and extract TAR.GZ file."""
+        """Download and extract TAR.GZ file, decompressing as the bytes arrive."""
         self.plugins_dir.mkdir(parents=True, exist_ok=True)
+        target_path = self.plugins_dir / target_name
         
-        with tempfile.NamedTemporaryFile(suffix=".tar.gz", delete=False) as tmp:
-            urllib.request.urlretrieve(url, tmp.name)
-            
-            with tarfile.open(tmp.name, 'r:gz') as tar_file:
-                tar_file.extract(source_name, self.plugins_dir)
+        import tarfile
+        import urllib.request
+        
+        # Streaming mode ('r|gz') reads the response sequentially, so the archive
+        # never touches the disk and extraction overlaps with the download
+        with urllib.request.urlopen(url) as response, \
+                tarfile.open(fileobj=response, mode='r|gz') as tar_file:
+            for member in tar_file:
+                if member.name != source_name or not member.isfile():
+                    continue
                 
-            source_path = self.plugins_dir / source_name
-            target_path = self.plugins_dir / target_name
-            
-            if source_path.exists():
-                source_path.rename(target_path)
+                with tar_file.extractfile(member) as src, open(target_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, DOWNLOAD_CHUNK_SIZE)
                 target_path.chmod(0o755)
-                print(f"{Colors.GREEN}✅ kubelogin installed to {target_path}{Colors.END}")
+                print_success(f"kubelogin installed to {target_path}")
                 return True
                 
         return False
@@ -463,35 +793,35 @@ users:
         """Configure kubectl with OIDC authentication."""
         print(f"{Colors.YELLOW}🔐 Configuring OIDC authentication...{Colors.END}")
         
+        loaded = None
         if not cluster_context:
-            result = self.run_command("kubectl config current-context", check=False)
-            if result and result.returncode == 0:
-                cluster_context = result.stdout.strip()
+            # Read the kubeconfig in-process rather than spawning kubectl for one field
+            loaded = self._load_kubeconfig()
+            if loaded:
+                cluster_context = loaded[1].get("current-context")
+            else:
+                result = self.run_command(["kubectl", "config", "current-context"], check=False, capture_output=True)
+                if result and result.returncode == 0:
+                    cluster_context = result.stdout.strip()
+            
+            if cluster_context:
                 print(f"{Colors.BLUE}📍 Using current cluster context: {cluster_context}{Colors.END}")
             else:
-                print(f"{Colors.RED}❌ No kubectl context found. Please configure kubectl first.{Colors.END}")
+                print_error("No kubectl context found. Please configure kubectl first.")
                 return False
         
-        # Configure OIDC user
-        oidc_args = [
-            "kubectl", "config", "set-credentials", "oidc-user",
-            "--exec-api-version=client.authentication.k8s.io/v1beta1",
-            "--exec-command=kubectl",
-            "--exec-arg=oidc-login",
-            "--exec-arg=get-token",
-            f"--exec-arg=--oidc-issuer-url={self.oidc_config['issuer_url']}",
-            f"--exec-arg=--oidc-client-id={self.oidc_config['client_id']}",
-            f"--exec-arg=--oidc-extra-scope={self.oidc_config['extra_scopes']}",
-            f"--exec-arg=--oidc-username-claim={self.oidc_config['username_claim']}",
-            f"--exec-arg=--oidc-groups-claim={self.oidc_config['groups_claim']}"
-        ]
+        if self._write_oidc_kubeconfig(cluster_context, self.oidc_exec_args, loaded):
+            print_success("OIDC user credentials configured")
+            print_success("OIDC context created")
+            return True
         
-        result = self.run_command(oidc_args, capture_output=False)
+        # Configure OIDC user
+        result = self.run_command(self._set_credentials_args)
         if not result or result.returncode != 0:
-            print(f"{Colors.RED}❌ Failed to configure OIDC user{Colors.END}")
+            print_error("Failed to configure OIDC user")
             return False
         
-        print(f"{Colors.GREEN}✅ OIDC user credentials configured{Colors.END}")
+        print_success("OIDC user credentials configured")
         
         # Create OIDC context
         context_args = [
@@ -500,25 +830,126 @@ users:
             "--user=oidc-user"
         ]
         
-        result = self.run_command(context_args, capture_output=False)
+        result = self.run_command(context_args)
         if not result or result.returncode != 0:
-            print(f"{Colors.RED}❌ Failed to create OIDC context{Colors.END}")
+            print_error("Failed to create OIDC context")
             return False
         
-        print(f"{Colors.GREEN}✅ OIDC context created{Colors.END}")
+        print_success("OIDC context created")
         return True
 
+    def _load_kubeconfig(self):
+        """Return (path, parsed config) for a single-file kubeconfig, or None.
+        
+        kubectl merges KUBECONFIG lists itself, so callers fall back to kubectl
+        for those, and when PyYAML or the file is unavailable.
+        """
+        kubeconfig = os.environ.get("KUBECONFIG") or str(self.kubeconfig_path)
+        if os.pathsep in kubeconfig:
+            return None
+        
+        try:
+            import yaml
+        except ImportError:
+            return None
+        
+        try:
+            with open(kubeconfig) as f:
+                config = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+        except (OSError, yaml.YAMLError):
+            return None
+        if not isinstance(config, dict):
+            return None
+        return kubeconfig, config
+
+    def _save_kubeconfig(self, kubeconfig, config):
+        """Atomically replace the kubeconfig file with ``config``."""
+        import yaml
+        
+        data = yaml.dump(config, Dumper=getattr(yaml, 'CSafeDumper', yaml.SafeDumper),
+                         default_flow_style=False, sort_keys=False).encode()
+        try:
+            self._replace_file(kubeconfig, data)
+        except OSError:
+            return False
+        return True
+
+    def _replace_file(self, path, data=None, source_path=None):
+        """Atomically replace ``path`` with ``data`` bytes or a copy of ``source_path``.
+        
+        kubectl may read the kubeconfig at any moment; a rename means it sees
+        either the old file or the new one, never a partial write. Like kubectl,
+        this writes through a symlinked kubeconfig, and it keeps the file's mode.
+        """
+        path = os.path.realpath(path)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".config-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                if source_path:
+                    with open(source_path, "rb") as src:
+                        shutil.copyfileobj(src, f)
+                else:
+                    f.write(data)
+            try:
+                shutil.copymode(path, tmp_path)
+            except FileNotFoundError:
+                pass  # New file: mkstemp's owner-only mode suits a kubeconfig
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _write_oidc_kubeconfig(self, cluster_context, exec_args, loaded=None):
+        """Add the OIDC user and context to the kubeconfig in one atomic write."""
+        loaded = loaded or self._load_kubeconfig()
+        if not loaded:
+            return False
+        kubeconfig, config = loaded
+        
+        def upsert(section, name, key, fields):
+            entries = config.get(section) or []
+            for entry in entries:
+                if entry.get("name") == name:
+                    entry.setdefault(key, {}).update(fields)
+                    break
+            else:
+                entries.append({"name": name, key: fields})
+            config[section] = entries
+        
+        upsert("users", "oidc-user", "user", {"exec": {
+            "apiVersion": "client.authentication.k8s.io/v1beta1",
+            "command": "kubectl",
+            "args": list(exec_args),
+            "env": None,
+            "interactiveMode": "IfAvailable",
+            "provideClusterInfo": False,
+        }})
+        upsert("contexts", "oidc-context", "context", {"cluster": cluster_context, "user": "oidc-user"})
+        
+        return self._save_kubeconfig(kubeconfig, config)
+
+    def _use_context(self, context):
+        """Switch the current context, editing the kubeconfig in-process when possible."""
+        loaded = self._load_kubeconfig()
+        if loaded and any(entry.get("name") == context for entry in loaded[1].get("contexts") or []):
+            loaded[1]["current-context"] = context
+            if self._save_kubeconfig(*loaded):
+                return True
+        
+        result = self.run_command(["kubectl", "config", "use-context", context])
+        return bool(result and result.returncode == 0)
+
     def test_authentication(self):
         """Test OIDC authentication."""
         print(f"{Colors.YELLOW}🧪 Testing OIDC authentication...{Colors.END}")
         
         # Switch to OIDC context
-        result = self.run_command("kubectl config use-context oidc-context", capture_output=False)
-        if not result or result.returncode != 0:
-            print(f"{Colors.RED}❌ Failed to switch to OIDC context{Colors.END}")
+        if not self._use_context("oidc-context"):
+            print_error("Failed to switch to OIDC context")
             return False
         
-        print(f"{Colors.GREEN}✅ Switched to OIDC context{Colors.END}")
+        print_success("Switched to OIDC context")
         print()
         print(f"{Colors.CYAN}🚀 Authentication is ready!{Colors.END}")
         print()
@@ -534,8 +965,75 @@ users:
         
         return True
 
-    def download_cluster_config(self, config_url=None, use_fallback=True):
-        """Download cluster configuration from URL and merge with kubeconfig."""
+    def _apply_cluster_config(self, cluster_config=None, source_path=None):
+        """Write cluster config to the kubeconfig, merging with any existing one.
+        
+        ``source_path`` names a file that already holds the config (the download
+        cache), which is used in place instead of writing ``cluster_config`` out.
+        """
+        # Create .kube directory if it doesn't exist
+        self.kubeconfig_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # If kubeconfig exists, backup first
+        if self.kubeconfig_path.exists():
+            backup_path = self.kubeconfig_path.with_suffix('.config.backup')
+            shutil.copy2(self.kubeconfig_path, backup_path)
+            print_success(f"Backed up existing kubeconfig to {backup_path}")
+            
+            # Merge configurations using kubectl
+            if source_path:
+                tmp_path = str(source_path)
+            else:
+                with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as tmp:
+                    tmp.write(cluster_config)
+                    tmp_path = tmp.name
+            
+            # Only KUBECONFIG differs from the current environment. The merged
+            # config is written back as-is, so it stays bytes rather than being
+            # decoded to str and encoded again
+            result = subprocess.run(
+                [self.kubectl_exe or 'kubectl', 'config', 'view', '--flatten'],
+                env={**os.environ, 'KUBECONFIG': f"{self.kubeconfig_path}{os.pathsep}{tmp_path}"},
+                capture_output=True
+            )
+            
+            if not source_path:
+                os.unlink(tmp_path)
+            if result.returncode == 0:
+                self._replace_file(self.kubeconfig_path, data=result.stdout)
+                print_success("Merged cluster config with existing kubeconfig")
+            else:
+                raise Exception(f"Failed to merge configs: {result.stderr.decode(errors='replace')}")
+        else:
+            # No existing config, just write it (a copy: kubectl edits the kubeconfig in place)
+            self._replace_file(self.kubeconfig_path, data=None if source_path else cluster_config.encode(),
+                               source_path=source_path)
+            print_success(f"Cluster configuration saved to {self.kubeconfig_path}")
+        
+        # List the contexts from the kubeconfig itself; kubectl only for multi-file setups
+        loaded = self._load_kubeconfig()
+        if loaded:
+            contexts = [entry["name"] for entry in loaded[1].get("contexts") or [] if entry.get("name")]
+        else:
+            result = self.run_command(["kubectl", "config", "get-contexts", "-o", "name"], check=False, capture_output=True)
+            contexts = result.stdout.strip().split('\n') if result and result.returncode == 0 else []
+        if contexts:
+            print_success("Available contexts:")
+            for ctx in contexts:
+                print(f"   • {ctx}")
+
+    def _fetch_cluster_config(self, config_url):
+        """GET the cluster configuration, conditionally if a cached copy exists."""
+        import requests
+        
+        return requests.get(config_url, headers=self._download_cache_headers(config_url), timeout=10)
+
+    def download_cluster_config(self, config_url=None, use_fallback=True, prefetch=None):
+        """Download cluster configuration from URL and merge with kubeconfig.
+        
+        ``prefetch`` is a Future of _fetch_cluster_config() started earlier, so
+        the download can overlap other work; its errors are handled as here.
+        """
         if not config_url:
             config_url = self.default_cluster_config_url
         
@@ -545,70 +1043,31 @@ users:
         cluster_config = None
         
         try:
-            import requests
-            
-            response = requests.get(config_url, timeout=10)
-            response.raise_for_status()
-            
-            cluster_config = response.text
-            print(f"{Colors.GREEN}✅ Downloaded cluster configuration from API{Colors.END}")
-            
-            # Create .kube directory if it doesn't exist
-            self.kubeconfig_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # If kubeconfig exists, backup first
-            if self.kubeconfig_path.exists():
-                backup_path = self.kubeconfig_path.with_suffix('.config.backup')
-                shutil.copy2(self.kubeconfig_path, backup_path)
-                print(f"{Colors.GREEN}✅ Backed up existing kubeconfig to {backup_path}{Colors.END}")
-                
-                # Merge configurations using kubectl
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as tmp:
-                    tmp.write(cluster_config)
-                    tmp_path = tmp.name
-                
-                env = os.environ.copy()
-                env['KUBECONFIG'] = f"{self.kubeconfig_path}{os.pathsep}{tmp_path}"
-                
-                result = subprocess.run(
-                    [self.kubectl_exe or 'kubectl', 'config', 'view', '--flatten'],
-                    env=env,
-                    capture_output=True,
-                    text=True
-                )
-                
-                if result.returncode == 0:
-                    self.kubeconfig_path.write_text(result.stdout)
-                    os.unlink(tmp_path)
-                    print(f"{Colors.GREEN}✅ Merged cluster config with existing kubeconfig{Colors.END}")
-                else:
-                    os.unlink(tmp_path)
-                    raise Exception(f"Failed to merge configs: {result.stderr}")
+            # Conditional request: an unchanged config comes back as an empty 304
+            response = prefetch.result() if prefetch else self._fetch_cluster_config(config_url)
+            if response.status_code == 304:
+                # Merge straight from the cached file rather than re-reading and re-writing it
+                print_success("Cluster configuration unchanged, using cached copy")
+                self._apply_cluster_config(source_path=self._download_cache_paths(config_url)[0])
             else:
-                # No existing config, just write it
-                self.kubeconfig_path.write_text(cluster_config)
-                print(f"{Colors.GREEN}✅ Cluster configuration saved to {self.kubeconfig_path}{Colors.END}")
-            
-            # Get cluster name from config
-            result = self.run_command("kubectl config get-contexts -o name", check=False)
-            if result and result.returncode == 0:
-                contexts = result.stdout.strip().split('\n')
-                if contexts:
-                    print(f"{Colors.GREEN}✅ Available contexts:{Colors.END}")
-                    for ctx in contexts:
-                        print(f"   • {ctx}")
+                response.raise_for_status()
+                cluster_config = response.text
+                self._store_download_cache(config_url, None, response.headers.get("ETag"),
+                                           data=response.content)
+                print_success("Downloaded cluster configuration from API")
+                self._apply_cluster_config(cluster_config)
             
             return True
             
         except ImportError:
-            print(f"{Colors.YELLOW}⚠️ requests library not available{Colors.END}")
+            print_warning("requests library not available")
             if use_fallback:
                 print(f"{Colors.CYAN}📦 Using embedded default configuration...{Colors.END}")
                 cluster_config = self.DEFAULT_CLUSTER_CONFIG
             else:
                 return False
         except Exception as e:
-            print(f"{Colors.YELLOW}⚠️ Failed to download cluster config: {e}{Colors.END}")
+            print_warning(f"Failed to download cluster config: {e}")
             if use_fallback:
                 print(f"{Colors.CYAN}📦 Using embedded default configuration...{Colors.END}")
                 cluster_config = self.DEFAULT_CLUSTER_CONFIG
@@ -621,103 +1080,86 @@ users:
             return False
             
         try:
-            # Create .kube directory if it doesn't exist
-            self.kubeconfig_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # If kubeconfig exists, backup first
-            if self.kubeconfig_path.exists():
-                backup_path = self.kubeconfig_path.with_suffix('.config.backup')
-                shutil.copy2(self.kubeconfig_path, backup_path)
-                print(f"{Colors.GREEN}✅ Backed up existing kubeconfig to {backup_path}{Colors.END}")
-                
-                # Merge configurations using kubectl
-                with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as tmp:
-                    tmp.write(cluster_config)
-                    tmp_path = tmp.name
-                
-                env = os.environ.copy()
-                env['KUBECONFIG'] = f"{self.kubeconfig_path}{os.pathsep}{tmp_path}"
-                
-                result = subprocess.run(
-                    [self.kubectl_exe or 'kubectl', 'config', 'view', '--flatten'],
-                    env=env,
-                    capture_output=True,
-                    text=True
-                )
-                
-                if result.returncode == 0:
-                    self.kubeconfig_path.write_text(result.stdout)
-                    os.unlink(tmp_path)
-                    print(f"{Colors.GREEN}✅ Merged cluster config with existing kubeconfig{Colors.END}")
-                else:
-                    os.unlink(tmp_path)
-                    raise Exception(f"Failed to merge configs: {result.stderr}")
-            else:
-                # No existing config, just write it
-                self.kubeconfig_path.write_text(cluster_config)
-                print(f"{Colors.GREEN}✅ Cluster configuration saved to {self.kubeconfig_path}{Colors.END}")
-            
-            # Get cluster name from config
-            result = self.run_command("kubectl config get-contexts -o name", check=False)
-            if result and result.returncode == 0:
-                contexts = result.stdout.strip().split('\n')
-                if contexts:
-                    print(f"{Colors.GREEN}✅ Available contexts:{Colors.END}")
-                    for ctx in contexts:
-                        print(f"   • {ctx}")
+            self._apply_cluster_config(cluster_config)
             
             return True
         except Exception as e:
-            print(f"{Colors.RED}❌ Failed to apply cluster config: {e}{Colors.END}")
+            print_error(f"Failed to apply cluster config: {e}")
             return False
 
     def run_setup(self, cluster_context=None, test_auth=True, download_config=False, config_url=None, python_only=False):
         """Run the complete setup process."""
+        use_plain_output_if_piped()
         self.print_header()
         
         if python_only:
             print(f"{Colors.CYAN}🐍 Python-only mode: Skipping kubelogin binary installation{Colors.END}")
         
-        # Check and install kubectl
-        if not self.check_kubectl():
-            if not self.install_kubectl():
-                print(f"{Colors.RED}❌ Setup failed: Could not install kubectl{Colors.END}")
-                return False
+        kubelogin_archive = None
+        config_fetch = None
+        try:
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                # Run the independent pre-flight probes concurrently, and fetch the
+                # cluster config meanwhile; it is only merged once kubectl is ready
+                if download_config or config_url:
+                    config_fetch = executor.submit(self._fetch_cluster_config,
+                                                   config_url or self.default_cluster_config_url)
+                kubectl_probe = executor.submit(self.check_kubectl)
+                kubelogin_probe = None if python_only else executor.submit(self.check_kubelogin)
+                kubectl_found = kubectl_probe.result()
+                kubelogin_found = kubelogin_probe.result() if kubelogin_probe else None
+                
+                # Check and install kubectl
+                if not kubectl_found:
+                    # The kubelogin release does not depend on kubectl, so fetch it
+                    # from GitHub while kubectl downloads from dl.k8s.io
+                    prefetch = executor.submit(self._prefetch_kubelogin) if kubelogin_found is False else None
+                    kubectl_installed = self.install_kubectl()
+                    kubelogin_archive = prefetch.result() if prefetch else None
             
-            # Verify kubectl is now accessible
-            print(f"{Colors.YELLOW}🔍 Verifying kubectl installation...{Colors.END}")
-            if not self.check_kubectl():
-                # Try using full path if available
-                if self.kubectl_exe:
-                    print(f"{Colors.YELLOW}💡 Using kubectl from: {self.kubectl_exe}{Colors.END}")
-                else:
-                    print(f"{Colors.RED}❌ kubectl installed but not accessible. Please restart your terminal.{Colors.END}")
+            if not kubectl_found:
+                if not kubectl_installed:
+                    print_error("Setup failed: Could not install kubectl")
                     return False
-        
-        # Check and install kubelogin (skip if python_only)
-        if not python_only:
-            if not self.check_kubelogin():
-                if not self.install_kubelogin():
-                    print(f"{Colors.YELLOW}⚠️ kubelogin plugin installation failed, but you can continue{Colors.END}")
-                    print(f"{Colors.YELLOW}   Manual installation: https://github.com/int128/kubelogin{Colors.END}")
-        else:
-            print(f"{Colors.CYAN}⏭️  Skipping kubelogin binary check{Colors.END}")
+                
+                # Verify kubectl is now accessible
+                print(f"{Colors.YELLOW}🔍 Verifying kubectl installation...{Colors.END}")
+                if not self.check_kubectl(show_version=False):
+                    # Try using full path if available
+                    if self.kubectl_exe:
+                        print(f"{Colors.YELLOW}💡 Using kubectl from: {self.kubectl_exe}{Colors.END}")
+                    else:
+                        print_error("kubectl installed but not accessible. Please restart your terminal.")
+                        return False
+            
+            # Check and install kubelogin (skip if python_only)
+            if not python_only:
+                if not kubelogin_found:
+                    archive, kubelogin_archive = kubelogin_archive, None
+                    if not self.install_kubelogin(archive):
+                        print_warning("kubelogin plugin installation failed, but you can continue")
+                        print(f"{Colors.YELLOW}   Manual installation: https://github.com/int128/kubelogin{Colors.END}")
+            else:
+                print(f"{Colors.CYAN}⏭️  Skipping kubelogin binary check{Colors.END}")
+        finally:
+            if kubelogin_archive:
+                os.unlink(kubelogin_archive)
         
         # Download cluster config if requested or if no context found
         if download_config or config_url:
-            if not self.download_cluster_config(config_url):
-                print(f"{Colors.RED}❌ Setup failed: Could not download cluster config{Colors.END}")
+            if not self.download_cluster_config(config_url, prefetch=config_fetch):
+                print_error("Setup failed: Could not download cluster config")
                 return False
         
         # Configure OIDC
         if not self.configure_oidc(cluster_context):
-            print(f"{Colors.RED}❌ Setup failed: Could not configure OIDC{Colors.END}")
+            print_error("Setup failed: Could not configure OIDC")
             return False
         
         # Test authentication
         if test_auth:
             if not self.test_authentication():
-                print(f"{Colors.RED}❌ Setup completed but authentication test failed{Colors.END}")
+                print_error("Setup completed but authentication test failed")
                 return False
         
         print()
@@ -21,15 +21,20 @@ import json
 import sys
 import os
 import time
-import webbrowser
-import urllib.request
-import urllib.parse
-import hashlib
-import base64
-import secrets
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from functools import lru_cache
 from pathlib import Path
-import threading
+
+# Everything else (browser, HTTP server, PKCE, HTTP client) is imported where it
+# is used: kubectl runs this plugin on every command, and with a cached token
+# none of it is needed.
+
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+    
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
 
 
 class OIDCConfig:
@@ -37,121 +42,621 @@ class OIDCConfig:
     ISSUER_URL = "https://sts.itlusions.com/realms/itlusions"
     CLIENT_ID = "kubernetes-oidc"
     REDIRECT_URI = "http://localhost:8000/callback"
+    # Callback ports tried in order (kubelogin's defaults, which the client allows)
+    CALLBACK_PORTS = (8000, 18000)
     SCOPES = ["openid", "email", "profile", "groups"]
     TOKEN_CACHE_DIR = Path.home() / ".kube" / "cache" / "oidc"
+    EXPIRY_BUFFER = 300  # Cached tokens closer than this to expiry are not handed out
+    REFRESH_WINDOW = 600  # Cached tokens closer than this to expiry are refreshed
+    DISCOVERY_TTL = 3600  # Lifetime of the cached discovery document and JWKS without max-age
 
 
-class CallbackHandler(BaseHTTPRequestHandler):
-    """HTTP handler for OIDC callback."""
+@lru_cache(maxsize=1)
+def get_callback_handler():
+    """Return the OIDC callback handler class, built on first use.
     
-    auth_code = None
-    auth_error = None
-    
-    def log_message(self, format, *args):
-        """Suppress HTTP server logs."""
-        pass
+    http.server, threading and urllib.parse are only needed for an interactive
+    login, so a cached-token run never imports them.
+    """
+    import hmac
+    import threading
+    import urllib.parse
+    from http.server import BaseHTTPRequestHandler
     
-    def do_GET(self):
-        """Handle callback GET request."""
-        query = urllib.parse.urlparse(self.path).query
-        params = urllib.parse.parse_qs(query)
+    class CallbackHandler(BaseHTTPRequestHandler):
+        """HTTP handler for OIDC callback."""
         
-        if 'code' in params:
-            CallbackHandler.auth_code = params['code'][0]
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            html = '''
-                <html>
-                <head><title>Authentication Successful</title></head>
-                <body style="font-family: Arial; text-align: center; padding: 50px;">
-                    <h1 style="color: green;">Authentication Successful!</h1>
-                    <p>You can close this window and return to your terminal.</p>
-                </body>
-                </html>
-            '''
-            self.wfile.write(html.encode('utf-8'))
-        elif 'error' in params:
-            CallbackHandler.auth_error = params['error'][0]
-            self.send_response(400)
-            self.send_header('Content-type', 'text/html')
-            self.end_headers()
-            error_desc = params.get('error_description', ['Unknown error'])[0]
-            html = f'''
-                <html>
-                <head><title>Authentication Failed</title></head>
-                <body style="font-family: Arial; text-align: center; padding: 50px;">
-                    <h1 style="color: red;">Authentication Failed</h1>
-                    <p>Error: {error_desc}</p>
-                </body>
-                </html>
-            '''
-            self.wfile.write(html.encode('utf-8'))
-        else:
-            self.send_response(400)
-            self.end_headers()
+        auth_code = None
+        auth_error = None
+        expected_state = b""  # Callbacks must echo this login's state parameter
+        done = threading.Event()  # Set once a code or an error has been received
+        
+        def log_message(self, format, *args):
+            """Suppress HTTP server logs."""
+            pass
+        
+        def do_GET(self):
+            """Handle callback GET request."""
+            query = urllib.parse.urlparse(self.path).query
+            params = urllib.parse.parse_qs(query)
+            
+            # Anything on this machine can reach the callback port; only the
+            # redirect for our own authorization request knows the state.
+            # compare_digest keeps the check constant-time.
+            state = params.get('state', [''])[0].encode()
+            if not hmac.compare_digest(state, CallbackHandler.expected_state):
+                self.send_response(400)
+                self.end_headers()
+                return
+            
+            if 'code' in params:
+                CallbackHandler.auth_code = params['code'][0]
+                CallbackHandler.done.set()
+                self.send_response(200)
+                self.send_header('Content-type', 'text/html')
+                self.end_headers()
+                html = '''
+                    <html>
+                    <head><title>Authentication Successful</title></head>
+                    <body style="font-family: Arial; text-align: center; padding: 50px;">
+                        <h1 style="color: green;">Authentication Successful!</h1>
+                        <p>You can close this window and return to your terminal.</p>
+                    </body>
+                    </html>
+                '''
+                self.wfile.write(html.encode('utf-8'))
+            elif 'error' in params:
+                CallbackHandler.auth_error = params['error'][0]
+                CallbackHandler.done.set()
+                self.send_response(400)
+                self.send_header('Content-type', 'text/html')
+                self.end_headers()
+                error_desc = params.get('error_description', ['Unknown error'])[0]
+                html = f'''
+                    <html>
+                    <head><title>Authentication Failed</title></head>
+                    <body style="font-family: Arial; text-align: center; padding: 50px;">
+                        <h1 style="color: red;">Authentication Failed</h1>
+                        <p>Error: {error_desc}</p>
+                    </body>
+                    </html>
+                '''
+                self.wfile.write(html.encode('utf-8'))
+            else:
+                self.send_response(400)
+                self.end_headers()
+    
+    return CallbackHandler
+
+
+def __getattr__(name):
+    # Keep ``oidc_auth.CallbackHandler`` working without building it at import time
+    if name == 'CallbackHandler':
+        return get_callback_handler()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=4)
+def get_auth_query_prefix(redirect_uri=OIDCConfig.REDIRECT_URI):
+    """Return the static part of the authorization request query, encoded once."""
+    import urllib.parse
+    
+    static_params = urllib.parse.urlencode({
+        'client_id': OIDCConfig.CLIENT_ID,
+        'response_type': 'code',
+        'redirect_uri': redirect_uri,
+        'scope': ' '.join(OIDCConfig.SCOPES),
+        'code_challenge_method': 'S256'
+    })
+    return f"{static_params}&code_challenge="
 
 
 def generate_pkce_pair():
     """Generate PKCE code verifier and challenge."""
-    code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode('utf-8').rstrip('=')
-    code_challenge = base64.urlsafe_b64encode(
-        hashlib.sha256(code_verifier.encode()).digest()
-    ).decode('utf-8').rstrip('=')
-    return code_verifier, code_challenge
+    import base64
+    import hashlib
+    import secrets
+    
+    # Stay in bytes until the end; the verifier's ASCII bytes are what gets hashed
+    code_verifier = base64.urlsafe_b64encode(secrets.token_bytes(32)).rstrip(b'=')
+    code_challenge = base64.urlsafe_b64encode(hashlib.sha256(code_verifier).digest()).rstrip(b'=')
+    return code_verifier.decode('ascii'), code_challenge.decode('ascii')
 
 
+@lru_cache(maxsize=1)
 def get_token_cache_path():
-    """Get path to token cache file."""
+    """Get path to token cache file (the directory is created once per process)."""
     cache_dir = OIDCConfig.TOKEN_CACHE_DIR
     cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir / "itlusions_token.json"
+    return cache_dir / "itlusions_token.cache"
 
 
-def load_cached_token():
-    """Load cached token if available and valid."""
+# Cache file layout: "<expiry, 10 digits>\n<id token>\n<JSON of remaining fields>".
+# Keeping expiry and token in plain lines lets the common "token still valid"
+# check skip JSON parsing entirely. Older releases wrote one JSON document to
+# itlusions_token.json; it is still read when there is no cache in the new format.
+LEGACY_TOKEN_CACHE_NAME = "itlusions_token.json"
+
+
+def read_token_cache():
+    """Read the token cache, including expired entries; None if missing or unreadable."""
     cache_path = get_token_cache_path()
-    
-    if not cache_path.exists():
+    try:
+        raw = cache_path.read_bytes()
+    except FileNotFoundError:
+        try:
+            return _json_loads((cache_path.parent / LEGACY_TOKEN_CACHE_NAME).read_bytes())
+        except (OSError, ValueError):
+            return None
+    except OSError:
         return None
     
     try:
-        with open(cache_path, 'r') as f:
-            token_data = json.load(f)
+        if raw.startswith(b'{'):
+            return _json_loads(raw)  # Entry without a token, stored as plain JSON
         
-        # Check if token is still valid (with 5 minute buffer)
-        if 'expiry' in token_data:
-            expiry = token_data['expiry']
-            if time.time() < expiry - 300:  # 5 minute buffer
-                return token_data
-    except:
-        pass
+        expiry, token, rest = raw.split(b'\n', 2)
+        token_data = _json_loads(rest) if rest else {}
+        token_data['expiry'] = int(expiry)
+        token_data['token'] = token.decode('ascii')
+        return token_data
+    except (ValueError, TypeError):
+        return None
+
+
+def peek_cached_token(buffer=OIDCConfig.REFRESH_WINDOW):
+    """Return (token, expiry) from the cache header if valid for ``buffer`` seconds, else None.
     
+    Only the expiry and token lines are looked at; the JSON part is not parsed.
+    """
+    try:
+        expiry, token, _ = get_token_cache_path().read_bytes().split(b'\n', 2)
+        expiry = int(expiry)
+    except (OSError, ValueError):
+        return None
+    
+    if time.time() < expiry - buffer:
+        return token.decode('ascii'), expiry
     return None
 
 
+def is_token_valid(token_data, buffer=OIDCConfig.EXPIRY_BUFFER):
+    """Check whether a cached token is valid for at least ``buffer`` more seconds."""
+    return 'expiry' in token_data and time.time() < token_data['expiry'] - buffer
+
+
+def load_cached_token():
+    """Load cached token if available and valid."""
+    token_data = read_token_cache()
+    if token_data and is_token_valid(token_data) and verify_token_offline(token_data.get('token', '')):
+        return token_data
+    return None
+
+
+_connections = {}  # (scheme, host) -> keep-alive connection, reused for the life of the process
+
+
+def http_request(url, data=None, headers=None, timeout=10, max_redirects=5):
+    """GET a URL, or POST ``data``, and return (status, headers, body bytes).
+    
+    Discovery, JWKS and token requests all go to the issuer host, so they share
+    one keep-alive connection (and TLS session) instead of a new handshake each.
+    Not thread-safe; the token agent refreshes under its own lock. Statuses
+    other than 2xx and 304 raise urllib.error.HTTPError, as urlopen would.
+    """
+    import http.client
+    import io
+    import urllib.error
+    import urllib.parse
+    import urllib.request
+    
+    headers = {"Accept": "application/json", **(headers or {})}
+    if data is not None:
+        headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+    
+    for _ in range(max_redirects + 1):
+        parts = urllib.parse.urlsplit(url)
+        if urllib.request.getproxies().get(parts.scheme) and not urllib.request.proxy_bypass(parts.hostname):
+            # http.client does not honour proxy settings; let urllib handle them
+            try:
+                with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers),
+                                            timeout=timeout) as response:
+                    return response.status, response.headers, response.read()
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    return e.code, e.headers, b""
+                raise
+        
+        key = (parts.scheme, parts.netloc)
+        target = f"{parts.path or '/'}?{parts.query}" if parts.query else parts.path or "/"
+        for attempt in range(2):
+            conn = _connections.get(key)
+            reused = conn is not None
+            if not reused:
+                connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+                conn = _connections[key] = connection_class(parts.netloc, timeout=timeout)
+            try:
+                conn.request("POST" if data is not None else "GET", target, body=data, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                del _connections[key]
+                # The server may have closed an idle connection; retry a GET once on a
+                # fresh one. A POST may already have been processed (a redeemed code or
+                # rotated refresh token), so it is never sent twice
+                if not reused or attempt or data is not None:
+                    raise
+        
+        if response.status in (301, 302, 303, 307, 308) and data is None:
+            url = urllib.parse.urljoin(url, response.getheader("Location"))
+            continue
+        if 200 <= response.status < 300 or response.status == 304:
+            return response.status, response.headers, body
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(body))
+    
+    raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, io.BytesIO(body))
+
+
+def http_request_json(url, form=None, timeout=10):
+    """GET a URL, or POST ``form`` as form data, and return the decoded JSON body.
+    
+    Stays stdlib-only for the exec plugin. HTTP errors raise
+    urllib.error.HTTPError; network failures raise other OSErrors.
+    """
+    import urllib.parse
+    
+    data = urllib.parse.urlencode(form).encode() if form is not None else None
+    return _json_loads(http_request(url, data=data, timeout=timeout)[2])
+
+
+def http_get_json_conditional(url, etag=None, last_modified=None, timeout=10):
+    """GET a JSON document, revalidating with ``etag`` and/or ``last_modified`` if given.
+    
+    Returns (body, headers); body is None when the server answers 304 Not Modified.
+    """
+    conditions = {}
+    if etag:
+        conditions["If-None-Match"] = etag
+    if last_modified:
+        conditions["If-Modified-Since"] = last_modified
+    status, headers, body = http_request(url, headers=conditions, timeout=timeout)
+    if status == 304 and conditions:
+        # A 304 need not repeat the validators; the ones sent still apply
+        for name, value in (("ETag", etag), ("Last-Modified", last_modified)):
+            if value and name not in headers:
+                headers[name] = value
+        return None, headers
+    return _json_loads(body), headers
+
+
+def get_cache_ttl(headers):
+    """Seconds to keep a response: $ITLC_OIDC_CACHE_TTL, else Cache-Control max-age, else DISCOVERY_TTL.
+    
+    no-store/no-cache (Keycloak's default) are not taken literally: the entry is
+    revalidated with its ETag once the default TTL is up.
+    """
+    override = os.environ.get('ITLC_OIDC_CACHE_TTL')
+    if override:
+        try:
+            return int(override)
+        except ValueError:
+            pass
+    
+    for directive in (headers.get('Cache-Control') or '').split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() == 'max-age':
+            try:
+                return max(int(value.strip('"')), 0)
+            except ValueError:
+                break
+    return OIDCConfig.DISCOVERY_TTL
+
+
+def post_token_request(token_url, token_params):
+    """POST form parameters to the token endpoint and return the decoded JSON response."""
+    return http_request_json(token_url, form=token_params)
+
+
+_discovery_entry = None  # Fresh entry held in memory for the rest of the process
+
+# The only discovery fields the plugin reads; Keycloak publishes dozens more
+DISCOVERY_FIELDS = ('issuer', 'authorization_endpoint', 'token_endpoint', 'jwks_uri')
+# Certificate chains duplicate the RSA key parameters that verification uses
+JWK_UNUSED_FIELDS = ('x5c', 'x5t', 'x5t#S256')
+
+
+def trim_discovery(config, jwks):
+    """Reduce the discovery document and JWKS to the fields the plugin uses.
+    
+    Keeps discovery.json small, since it is read back on every token check.
+    Raises ValueError when the document is for another issuer.
+    """
+    if config.get('issuer') != OIDCConfig.ISSUER_URL:
+        raise ValueError(f"Discovery document is for issuer {config.get('issuer')!r}")
+    config = {name: config[name] for name in DISCOVERY_FIELDS if name in config}
+    keys = [{name: value for name, value in key.items() if name not in JWK_UNUSED_FIELDS}
+            for key in jwks.get('keys', [])]
+    return config, {'keys': keys}
+
+
+def load_discovery_cache(refresh=False):
+    """Return the cached discovery entry for the issuer, fetching it when stale.
+    
+    The entry holds the OpenID configuration under ``config`` and the issuer's
+    signing keys under ``jwks``. If the issuer cannot be reached and nothing is
+    cached, Keycloak's standard endpoints are assumed and ``jwks`` is None.
+    ``refresh`` refetches even a fresh entry, e.g. after a signing key rotation.
+    
+    A fresh entry is also kept in memory, so a login, a refresh and a token
+    check in one process (or the long-running token agent) read the disk once.
+    """
+    global _discovery_entry
+    entry = _discovery_entry
+    if entry and not refresh and time.time() < entry['expiry']:
+        return entry
+    
+    cache_path = OIDCConfig.TOKEN_CACHE_DIR / "discovery.json"
+    
+    try:
+        entry = _json_loads(cache_path.read_bytes())
+        if entry.get('issuer') != OIDCConfig.ISSUER_URL:
+            entry = None
+        elif time.time() < entry['expiry'] and not refresh:
+            _discovery_entry = entry
+            return entry
+    except (OSError, ValueError, KeyError):
+        entry = None
+    
+    # Revalidate a stale entry with its ETag or Last-Modified validators: an
+    # unchanged document costs an empty 304
+    etags = (entry or {}).get('etags') or {}
+    last_modified = (entry or {}).get('last_modified') or {}
+    try:
+        discovery_url = f"{OIDCConfig.ISSUER_URL}/.well-known/openid-configuration"
+        config, config_headers = http_get_json_conditional(discovery_url, etags.get('config'),
+                                                           last_modified.get('config'))
+        if config is None:
+            config = entry['config']
+        
+        if not (entry and entry.get('jwks')):
+            etags = last_modified = {}
+        jwks, jwks_headers = http_get_json_conditional(config['jwks_uri'], etags.get('jwks'),
+                                                       last_modified.get('jwks'))
+        if jwks is None:
+            jwks = entry['jwks']
+        config, jwks = trim_discovery(config, jwks)
+    except Exception:
+        if entry:
+            return entry  # A stale copy beats hard-coded guesses
+        return {
+            'issuer': OIDCConfig.ISSUER_URL,
+            'config': {
+                'authorization_endpoint': f"{OIDCConfig.ISSUER_URL}/protocol/openid-connect/auth",
+                'token_endpoint': f"{OIDCConfig.ISSUER_URL}/protocol/openid-connect/token",
+            },
+            'jwks': None,
+        }
+    
+    entry = {
+        'issuer': OIDCConfig.ISSUER_URL,
+        'expiry': time.time() + min(get_cache_ttl(config_headers), get_cache_ttl(jwks_headers)),
+        'config': config,
+        'jwks': jwks,
+        'etags': {'config': config_headers.get('ETag'), 'jwks': jwks_headers.get('ETag')},
+        'last_modified': {'config': config_headers.get('Last-Modified'),
+                          'jwks': jwks_headers.get('Last-Modified')},
+    }
+    _discovery_entry = entry
+    try:
+        get_token_cache_path()  # Ensures the cache directory exists
+        cache_path.write_bytes(_json_dumps(entry))
+    except OSError:
+        pass  # Fail silently if we can't cache
+    
+    return entry
+
+
+def load_discovery():
+    """Return the issuer's OpenID configuration (cached on disk for an hour)."""
+    return load_discovery_cache()['config']
+
+
+def load_jwks(refresh=False):
+    """Return the issuer's JSON Web Key Set, or None if it could not be fetched."""
+    return load_discovery_cache(refresh)['jwks']
+
+
+def verify_token_offline(token):
+    """Check the token's signature and exp/iat/iss/aud claims against the cached JWKS.
+    
+    Catches tokens signed with a rotated-out key before kubectl sends them and
+    gets a 401. An unknown key or bad signature triggers one JWKS refetch.
+    Returns False only when the token is definitely unusable; without PyJWT
+    (``pip install 'itlc[verify]'``) or a JWKS the check is skipped.
+    """
+    try:
+        import jwt
+    except ImportError:
+        return True
+    
+    jwks = load_jwks()
+    for attempt in range(2):
+        if not jwks:
+            return True
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+            jwk = next((k for k in jwks.get('keys', []) if k.get('kid') == kid), None)
+            if jwk is None:
+                raise jwt.InvalidKeyError(f"Unknown signing key: {kid}")
+            jwt.decode(
+                token,
+                key=jwt.PyJWK(jwk).key,
+                algorithms=[jwk.get('alg', 'RS256')],
+                audience=OIDCConfig.CLIENT_ID,
+                issuer=OIDCConfig.ISSUER_URL,
+                leeway=60,
+                options={'require': ['exp', 'iat', 'iss', 'aud']},
+            )
+            return True
+        except (jwt.InvalidSignatureError, jwt.InvalidKeyError):
+            if attempt:
+                return False
+            jwks = load_jwks(refresh=True)  # The issuer may have rotated its keys
+        except jwt.PyJWKError:
+            return True  # Key type not supported here; let the API server decide
+        except jwt.PyJWTError:
+            return False
+    return False
+
+
 def save_token_cache(token_data):
     """Save token to cache."""
+    import tempfile
+    
     cache_path = get_token_cache_path()
     
+    if 'token' in token_data and 'expiry' in token_data:
+        rest = {k: v for k, v in token_data.items() if k not in ('token', 'expiry')}
+        payload = f"{int(token_data['expiry']):010d}\n{token_data['token']}\n".encode() + _json_dumps(rest)
+    else:
+        payload = _json_dumps(token_data)
+    
     try:
-        with open(cache_path, 'w') as f:
-            json.dump(token_data, f)
-        cache_path.chmod(0o600)  # Secure permissions
-    except:
-        pass  # Fail silently if we can't cache
+        # mkstemp creates the file owner-only (0600); one write, then an atomic
+        # rename so readers never see a partially written cache
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, prefix='.token-')
+    except OSError:
+        return  # Fail silently if we can't cache
+    try:
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        return
+    
+    # The legacy cache is only a fallback for the first run; do not leave its
+    # refresh token behind once the new cache exists
+    try:
+        (cache_path.parent / LEGACY_TOKEN_CACHE_NAME).unlink()
+    except OSError:
+        pass
+
+
+def cache_token_response(token_response, refresh_token=None):
+    """Cache a token endpoint response and return (id_token, expiry)."""
+    id_token = token_response.get('id_token')
+    expires_in = token_response.get('expires_in', 3600)
+    
+    if not id_token:
+        raise Exception("No ID token in response")
+    
+    # Calculate expiry
+    expiry = int(time.time() + expires_in)
+    
+    # Cache token; keep the previous refresh token unless the server rotated it
+    cache_data = {
+        'token': id_token,
+        'expiry': expiry,
+        'refresh_token': token_response.get('refresh_token') or refresh_token
+    }
+    save_token_cache(cache_data)
+    
+    return id_token, expiry
+
+
+def refresh_oidc_token(refresh_token):
+    """Exchange a refresh token for a new ID token and return (id_token, expiry)."""
+    token_url = load_discovery()['token_endpoint']
+    token_params = {
+        'grant_type': 'refresh_token',
+        'refresh_token': refresh_token,
+        'client_id': OIDCConfig.CLIENT_ID
+    }
+    
+    return cache_token_response(post_token_request(token_url, token_params), refresh_token)
+
+
+def get_cached_oidc_token():
+    """Return (token, expiry) from the cache, refreshing it if needed; None if a login is required.
+    
+    Never opens a browser, so it is also safe to call from the token agent.
+    """
+    # Fast path: a token that is not due for refresh, read from the cache header
+    fresh = peek_cached_token()
+    if fresh:
+        return fresh
+    
+    # Check cache first, including expired entries that still carry a refresh token
+    cached = read_token_cache()
+    if cached and 'token' in cached:
+        # A token signed with a key the issuer no longer publishes would only earn a 401
+        usable = is_token_valid(cached) and verify_token_offline(cached['token'])
+        if usable and (is_token_valid(cached, OIDCConfig.REFRESH_WINDOW) or not cached.get('refresh_token')):
+            return cached['token'], cached.get('expiry')
+        
+        if cached.get('refresh_token'):
+            import urllib.error
+            
+            # One token request instead of a browser round trip; refresh ahead
+            # of expiry so kubectl never has to wait for an interactive login
+            try:
+                return refresh_oidc_token(cached['refresh_token'])
+            except urllib.error.HTTPError as e:
+                # 400/401 mean the refresh token expired or was revoked: log in again
+                if e.code not in (400, 401) and not usable:
+                    raise
+            except OSError:
+                # Token endpoint unreachable; a browser login would fail the same way
+                if not usable:
+                    raise
+            except Exception:
+                pass  # Unusable refresh response; fall back to a new login
+            
+            if usable:
+                return cached['token'], cached.get('expiry')
+    
+    return None
 
 
 def get_oidc_token():
     """Perform OIDC authentication flow and return token."""
+    cached = get_cached_oidc_token()
+    if cached:
+        return cached
     
-    # Check cache first
-    cached = load_cached_token()
-    if cached and 'token' in cached:
-        return cached['token'], cached.get('expiry')
+    import secrets
+    import threading
+    import webbrowser
+    from http.server import HTTPServer
+    
+    # Reset callback state from any previous login in this process
+    state = secrets.token_urlsafe(24)
+    handler = get_callback_handler()
+    handler.auth_code = None
+    handler.auth_error = None
+    handler.expected_state = state.encode()
+    handler.done.clear()
     
-    # Start local HTTP server for callback
-    server = HTTPServer(('localhost', 8000), CallbackHandler)
+    # Start local HTTP server for callback on the first free port, so a login
+    # already waiting in another kubectl process doesn't make this one fail.
+    # HTTPServer sets SO_REUSEADDR, so ports in TIME_WAIT are reusable at once.
+    for port in OIDCConfig.CALLBACK_PORTS:
+        try:
+            server = HTTPServer(('localhost', port), handler)
+            break
+        except OSError:
+            if port == OIDCConfig.CALLBACK_PORTS[-1]:
+                raise
+    redirect_uri = f"http://localhost:{port}/callback"
     server_thread = threading.Thread(target=server.serve_forever)
     server_thread.daemon = True
     server_thread.start()
@@ -160,100 +665,117 @@ def get_oidc_token():
         # Generate PKCE parameters
         code_verifier, code_challenge = generate_pkce_pair()
         
-        # Build authorization URL
-        auth_params = {
-            'client_id': OIDCConfig.CLIENT_ID,
-            'response_type': 'code',
-            'redirect_uri': OIDCConfig.REDIRECT_URI,
-            'scope': ' '.join(OIDCConfig.SCOPES),
-            'code_challenge': code_challenge,
-            'code_challenge_method': 'S256'
-        }
-        
-        auth_url = f"{OIDCConfig.ISSUER_URL}/protocol/openid-connect/auth?{urllib.parse.urlencode(auth_params)}"
+        # Build authorization URL; the base64url challenge and state need no further escaping
+        discovery = load_discovery()
+        auth_url = (f"{discovery['authorization_endpoint']}?{get_auth_query_prefix(redirect_uri)}"
+                    f"{code_challenge}&state={state}")
         
         # Open browser for authentication
         print("🔐 Opening browser for authentication...", file=sys.stderr)
         print(f"   If browser doesn't open, visit: {auth_url}", file=sys.stderr)
         webbrowser.open(auth_url)
         
-        # Wait for callback (max 2 minutes)
-        timeout = 120
-        start_time = time.time()
-        
-        while CallbackHandler.auth_code is None and CallbackHandler.auth_error is None:
-            if time.time() - start_time > timeout:
-                raise Exception("Authentication timeout - no response received")
-            time.sleep(0.5)
+        # Wait for callback (max 2 minutes); the handler wakes us as soon as it arrives
+        if not handler.done.wait(timeout=120):
+            raise Exception("Authentication timeout - no response received")
         
-        if CallbackHandler.auth_error:
-            raise Exception(f"Authentication failed: {CallbackHandler.auth_error}")
+        if handler.auth_error:
+            raise Exception(f"Authentication failed: {handler.auth_error}")
         
-        if not CallbackHandler.auth_code:
+        if not handler.auth_code:
             raise Exception("No authorization code received")
         
         # Exchange code for token
-        token_url = f"{OIDCConfig.ISSUER_URL}/protocol/openid-connect/token"
+        token_url = discovery['token_endpoint']
         token_params = {
             'grant_type': 'authorization_code',
-            'code': CallbackHandler.auth_code,
-            'redirect_uri': OIDCConfig.REDIRECT_URI,
+            'code': handler.auth_code,
+            'redirect_uri': redirect_uri,
             'client_id': OIDCConfig.CLIENT_ID,
             'code_verifier': code_verifier
         }
         
-        data = urllib.parse.urlencode(token_params).encode()
-        req = urllib.request.Request(token_url, data=data)
-        req.add_header('Content-Type', 'application/x-www-form-urlencoded')
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            token_response = json.loads(response.read().decode())
-        
-        id_token = token_response.get('id_token')
-        expires_in = token_response.get('expires_in', 3600)
-        
-        if not id_token:
-            raise Exception("No ID token in response")
-        
-        # Calculate expiry
-        expiry = int(time.time() + expires_in)
-        
-        # Cache token
-        cache_data = {
-            'token': id_token,
-            'expiry': expiry,
-            'refresh_token': token_response.get('refresh_token')
-        }
-        save_token_cache(cache_data)
-        
-        return id_token, expiry
+        return cache_token_response(post_token_request(token_url, token_params))
         
     finally:
         server.shutdown()
 
 
-def output_credential(token, expiry):
-    """Output credential in ExecCredential format."""
-    
-    # Convert expiry to RFC3339 format
-    from datetime import datetime, timezone
-    expiry_time = datetime.fromtimestamp(expiry, tz=timezone.utc).isoformat()
-    
+def format_credential(token, expiry):
+    """Serialize a token as ExecCredential JSON bytes."""
     credential = {
         "apiVersion": "client.authentication.k8s.io/v1beta1",
         "kind": "ExecCredential",
         "status": {
             "token": token,
-            "expirationTimestamp": expiry_time
+            "expirationTimestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(expiry))  # RFC3339
         }
     }
+    return _json_dumps(credential)
+
+
+def write_credential(payload):
+    """Write serialized ExecCredential JSON to stdout."""
+    sys.stdout.buffer.write(payload + b"\n")
+    sys.stdout.flush()
+
+
+def output_credential(token, expiry):
+    """Output credential in ExecCredential format."""
+    write_credential(format_credential(token, expiry))
+
+
+# Token agent client. The server lives in itlc.token_agent; only this side runs
+# on every kubectl call, so it needs nothing beyond the socket module.
+AGENT_REQUEST = b"TOKEN\n"
+
+
+def get_agent_socket_path():
+    """Get the agent socket path ($XDG_RUNTIME_DIR if set, else the token cache directory)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "itlc.sock"
+    return OIDCConfig.TOKEN_CACHE_DIR / "agent.sock"
+
+
+def request_agent_credential(timeout=1.0):
+    """Ask a running agent for ExecCredential JSON bytes; None if no agent is running or it has no token."""
+    import socket
     
-    print(json.dumps(credential))
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(get_agent_socket_path()))
+            sock.sendall(AGENT_REQUEST)
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = sock.recv(8192)
+                if not chunk:
+                    break
+                reply += chunk
+        expiry, credential = reply.rstrip(b"\n").split(b" ", 1)
+        expiry = int(expiry)
+    except (OSError, ValueError):
+        return None
+    
+    if time.time() < expiry - OIDCConfig.EXPIRY_BUFFER:
+        return credential
+    return None
 
 
 def main():
     """Main entry point for credential exec plugin."""
     try:
+        # A running token agent answers with a ready-made credential, without
+        # touching the cache or the network
+        credential = request_agent_credential()
+        if credential:
+            write_credential(credential)
+            return
+        
         # Check if running in interactive mode
         interactive = os.environ.get('KUBECTL_EXEC_INTERACTIVE_MODE') == 'IfAvailable'
         
@@ -0,0 +1,21 @@
+"""
+Local State Paths
+Per-user directories under ~/.itl used by the CLI
+"""
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def get_itl_dir(name: Optional[str] = None) -> Path:
+    """
+    Get ~/.itl (or a named subdirectory of it), creating it on first use.
+    
+    Memoized so Path.home() and the mkdir run once per process per directory.
+    """
+    path = Path.home() / '.itl'
+    if name:
+        path = path / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
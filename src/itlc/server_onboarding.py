@@ -11,6 +11,9 @@ import requests
 from pathlib import Path
 from typing import Optional
 import json
+from functools import lru_cache
+
+from .paths import get_itl_dir
 
 
 class ServerOnboardingClient:
@@ -73,8 +76,9 @@ class ServerOnboardingClient:
             return False
 
 
+@lru_cache(maxsize=None)
 def check_kubectl_installed() -> bool:
-    """Check if kubectl is installed"""
+    """Check if kubectl is installed (probed once per process; cache_clear() to re-probe)"""
     try:
         result = subprocess.run(
             ['kubectl', 'version', '--client'],
@@ -127,8 +131,7 @@ resource "null_resource" "itl_setup" {{
 
 def save_token_locally(token: str, cluster_name: str) -> Path:
     """Save token to local file for reference"""
-    config_dir = Path.home() / '.itl' / 'onboarding'
-    config_dir.mkdir(parents=True, exist_ok=True)
+    config_dir = get_itl_dir('onboarding')
     
     token_file = config_dir / f'{cluster_name}.token'
     token_file.write_text(token)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Token Agent for the OIDC Credential Exec Plugin
+
+Keeps the current OIDC token in memory and hands it to ``itlc.oidc_auth`` over a
+per-user Unix socket, refreshing it in the background before it expires. With
+the agent running, each kubectl call is answered by one local socket round trip.
+
+The agent never opens a browser: when no usable token is cached it answers
+without one, and the exec plugin runs the interactive login itself.
+
+Start it once per session, for example from a systemd user unit:
+
+    [Service]
+    ExecStart=itlc-agent
+
+or from a shell rc file:
+
+    itlc-agent >/dev/null 2>&1 &
+"""
+
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+from .oidc_auth import (
+    AGENT_REQUEST,
+    OIDCConfig,
+    format_credential,
+    get_agent_socket_path,
+    get_cached_oidc_token,
+)
+
+
+class _AgentServer(socketserver.ThreadingUnixStreamServer):
+    """Threaded Unix socket server for the agent."""
+
+    daemon_threads = True
+    # Tools like helm or k9s start many kubectl processes at once; the default
+    # backlog of 5 would refuse some of them and send them down the slow path
+    request_queue_size = 128
+
+
+class _AgentRequestHandler(socketserver.StreamRequestHandler):
+    """Answer one TOKEN request with "<expiry> <ExecCredential JSON>" or "NONE"."""
+
+    def handle(self):
+        if self.rfile.readline(64) != AGENT_REQUEST:
+            return
+        self.wfile.write(self.server.agent.current_reply())
+
+
+class TokenAgent:
+    """In-memory holder of the OIDC token, served over a Unix socket."""
+
+    def __init__(self, socket_path=None):
+        self.socket_path = Path(socket_path or get_agent_socket_path())
+        self._token = None  # (token, expiry)
+        # (expiry, reply) swapped as one object so requests never need the lock;
+        # the reply is serialized once per token, not per request
+        self._reply = (0, b"NONE\n")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._server = None
+
+    def current_reply(self):
+        """Return the reply for the held token, or NONE once it is about to expire."""
+        expiry, reply = self._reply
+        if time.time() >= expiry - OIDCConfig.EXPIRY_BUFFER:
+            return b"NONE\n"
+        return reply
+
+    def refresh(self):
+        """Refresh the held token when it is due and return it."""
+        with self._lock:
+            token = self._token
+            if token is None or time.time() >= token[1] - OIDCConfig.REFRESH_WINDOW:
+                try:
+                    self._token = get_cached_oidc_token()
+                except Exception:
+                    # Keep serving the old token while it is still valid
+                    if token is None or time.time() >= token[1] - OIDCConfig.EXPIRY_BUFFER:
+                        self._token = None
+                if self._token != token:
+                    self._reply = ((self._token[1], b"%d %s\n" % (self._token[1], format_credential(*self._token)))
+                                   if self._token else (0, b"NONE\n"))
+            return self._token
+
+    def _refresh_loop(self):
+        """Refresh the token shortly before it enters the refresh window.
+
+        Waits in slices against a wall-clock deadline: Event.wait runs on the
+        monotonic clock, which stops while a laptop sleeps, but token expiry
+        does not, so one long wait could wake up well past the deadline.
+        """
+        while not self._stop.is_set():
+            token = self.refresh()
+            if token:
+                deadline = max(token[1] - OIDCConfig.REFRESH_WINDOW, time.time() + 30)
+            else:
+                deadline = time.time() + 60  # Wait for the exec plugin to complete a login
+            while time.time() < deadline:
+                if self._stop.wait(min(deadline - time.time(), 60)):
+                    return
+
+    def serve_forever(self):
+        """Bind the socket and serve token requests until interrupted."""
+        if self.socket_path.exists() and self._agent_alive():
+            raise RuntimeError(f"Another agent is already listening on {self.socket_path}")
+
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self.socket_path.unlink()  # Stale socket from an agent that exited uncleanly
+        except FileNotFoundError:
+            pass
+
+        # Warm the token before accepting connections so the first request is
+        # answered from memory rather than waiting on a refresh
+        self.refresh()
+
+        # Owner-only socket: the token must not be readable by other users
+        old_umask = os.umask(0o077)
+        try:
+            server = _AgentServer(str(self.socket_path), _AgentRequestHandler)
+        finally:
+            os.umask(old_umask)
+        server.agent = self
+        self._server = server
+
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            self._stop.set()
+            server.server_close()
+            try:
+                self.socket_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        """Stop serve_forever from another thread and wait for it to return."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _agent_alive(self):
+        """Check whether something accepts connections on the socket path."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(1.0)
+                sock.connect(str(self.socket_path))
+            return True
+        except OSError:
+            return False
+
+
+def main():
+    """Main entry point for the token agent."""
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        print("❌ The token agent requires Unix domain sockets", file=sys.stderr)
+        sys.exit(1)
+
+    # systemd stops services with SIGTERM; exit through serve_forever's cleanup
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    agent = TokenAgent()
+    print(f"🔐 itlc token agent listening on {agent.socket_path}", file=sys.stderr)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        print(f"❌ Token agent failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,23 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 
+from .paths import get_itl_dir
+
+try:
+    import orjson
+    
+    def _json_loads(data: bytes):
+        return orjson.loads(data)
+    
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _json_loads(data: bytes):
+        return json.loads(data)
+    
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 
 class TokenCache:
     """
@@ -18,10 +35,9 @@ class TokenCache:
     def __init__(self, cache_dir: Optional[Path] = None):
         if cache_dir:
             self.cache_dir = cache_dir
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
         else:
-            self.cache_dir = Path.home() / '.itl' / 'token-cache'
-        
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.cache_dir = get_itl_dir('token-cache')
     
     def _get_cache_file(self, client_id: str) -> Path:
         """Get cache file path for client ID"""
@@ -42,7 +58,8 @@ class TokenCache:
             
             # Calculate expiry
             expires_in = token_data.get('expires_in', 3600)
-            expires_at = datetime.now() + timedelta(seconds=expires_in)
+            now = datetime.now()
+            expires_at = now + timedelta(seconds=expires_in)
             
             cache_entry = {
                 'client_id': client_id,
@@ -51,12 +68,11 @@ class TokenCache:
                 'token_type': token_data.get('token_type', 'Bearer'),
                 'expires_in': expires_in,
                 'expires_at': expires_at.isoformat(),
-                'cached_at': datetime.now().isoformat(),
+                'cached_at': now.isoformat(),
                 'scope': token_data.get('scope', '')
             }
             
-            with open(cache_file, 'w') as f:
-                json.dump(cache_entry, f, indent=2)
+            cache_file.write_bytes(_json_dumps(cache_entry))
             
         except Exception as e:
             print(f"Warning: Failed to cache token: {e}")
@@ -74,12 +90,11 @@ class TokenCache:
         try:
             cache_file = self._get_cache_file(client_id)
             
-            if not cache_file.exists():
+            try:
+                cache_entry = _json_loads(cache_file.read_bytes())
+            except FileNotFoundError:
                 return None
             
-            with open(cache_file, 'r') as f:
-                cache_entry = json.load(f)
-            
             # Check expiry
             expires_at = datetime.fromisoformat(cache_entry['expires_at'])
             now = datetime.now()
@@ -103,9 +118,7 @@ class TokenCache:
     def delete_token(self, client_id: str):
         """Delete cached token for client ID"""
         try:
-            cache_file = self._get_cache_file(client_id)
-            if cache_file.exists():
-                cache_file.unlink()
+            self._get_cache_file(client_id).unlink(missing_ok=True)
         except Exception:
             pass
     
@@ -122,13 +135,12 @@ class TokenCache:
         cached_tokens = []
         try:
             for cache_file in self.cache_dir.glob('*.json'):
-                with open(cache_file, 'r') as f:
-                    cache_entry = json.load(f)
-                    cached_tokens.append({
-                        'client_id': cache_entry['client_id'],
-                        'expires_at': cache_entry['expires_at'],
-                        'cached_at': cache_entry['cached_at']
-                    })
+                cache_entry = _json_loads(cache_file.read_bytes())
+                cached_tokens.append({
+                    'client_id': cache_entry['client_id'],
+                    'expires_at': cache_entry['expires_at'],
+                    'cached_at': cache_entry['cached_at']
+                })
         except Exception:
             pass
         
@@ -0,0 +1,200 @@
+"""
+Tests for the OIDC credential exec plugin's caches and token agent protocol
+"""
+
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Add the package to the path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from itlc import oidc_auth
+from itlc.oidc_auth import OIDCConfig
+
+
+class CacheDirTestCase(unittest.TestCase):
+    """Point the plugin's cache directory at a temporary directory"""
+
+    def setUp(self):
+        self.cache_dir = Path(tempfile.mkdtemp())
+        self._saved = (OIDCConfig.TOKEN_CACHE_DIR, OIDCConfig.ISSUER_URL)
+        OIDCConfig.TOKEN_CACHE_DIR = self.cache_dir
+        oidc_auth.get_token_cache_path.cache_clear()
+        oidc_auth._discovery_entry = None
+
+    def tearDown(self):
+        OIDCConfig.TOKEN_CACHE_DIR, OIDCConfig.ISSUER_URL = self._saved
+        oidc_auth.get_token_cache_path.cache_clear()
+        oidc_auth._discovery_entry = None
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+class TestTokenCache(CacheDirTestCase):
+    """Test the token cache file format"""
+
+    def test_round_trip_header_format(self):
+        """Test that expiry and token are stored as header lines and read back"""
+        expiry = int(time.time()) + 3600
+        token_data = {'token': 'header.payload.sig', 'expiry': expiry, 'refresh_token': 'r1'}
+        oidc_auth.save_token_cache(token_data)
+
+        raw = oidc_auth.get_token_cache_path().read_bytes()
+        self.assertTrue(raw.startswith(f"{expiry:010d}\nheader.payload.sig\n".encode()))
+        self.assertEqual(oidc_auth.read_token_cache(), token_data)
+
+    def test_peek_reads_header_only(self):
+        """Test that the header is enough to serve a fresh token"""
+        expiry = int(time.time()) + 3600
+        oidc_auth.get_token_cache_path().write_bytes(f"{expiry:010d}\ntok\nnot json".encode())
+
+        self.assertEqual(oidc_auth.peek_cached_token(), ('tok', expiry))
+        self.assertIsNone(oidc_auth.peek_cached_token(buffer=7200))
+
+    def test_reads_legacy_json(self):
+        """Test that the older all-JSON cache is read when no new cache exists"""
+        legacy = {'token': 'old', 'expiry': int(time.time()) + 3600, 'refresh_token': 'r0'}
+        legacy_path = self.cache_dir / oidc_auth.LEGACY_TOKEN_CACHE_NAME
+        legacy_path.write_text(json.dumps(legacy))
+
+        self.assertEqual(oidc_auth.read_token_cache(), legacy)
+
+        # Writing the new format retires the legacy file and its refresh token
+        oidc_auth.save_token_cache(legacy)
+        self.assertFalse(legacy_path.exists())
+        self.assertEqual(oidc_auth.read_token_cache(), legacy)
+
+    def test_unreadable_cache(self):
+        """Test that a corrupt or missing cache reads as no cache"""
+        self.assertIsNone(oidc_auth.read_token_cache())
+        oidc_auth.get_token_cache_path().write_bytes(b"garbage")
+        self.assertIsNone(oidc_auth.read_token_cache())
+        self.assertIsNone(oidc_auth.peek_cached_token())
+
+
+class _DiscoveryHandler(BaseHTTPRequestHandler):
+    """Serve a discovery document and JWKS with an ETag"""
+
+    protocol_version = 'HTTP/1.1'
+    requests_seen = []
+
+    def do_GET(self):
+        self.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.end_headers()
+            return
+
+        base = f"http://127.0.0.1:{self.server.server_port}"
+        if 'well-known' in self.path:
+            document = {
+                'issuer': f"{base}/realms/test",
+                'authorization_endpoint': f"{base}/auth",
+                'token_endpoint': f"{base}/token",
+                'jwks_uri': f"{base}/certs",
+                'claims_supported': ['sub'],
+            }
+        else:
+            document = {'keys': [{'kid': 'k1', 'kty': 'RSA', 'n': 'AQAB', 'e': 'AQAB', 'x5c': ['MII']}]}
+        body = json.dumps(document).encode()
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Cache-Control', 'max-age=120')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDiscoveryCache(CacheDirTestCase):
+    """Test discovery caching and revalidation"""
+
+    def setUp(self):
+        super().setUp()
+        _DiscoveryHandler.requests_seen = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _DiscoveryHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        OIDCConfig.ISSUER_URL = f"http://127.0.0.1:{self.server.server_port}/realms/test"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        for conn in oidc_auth._connections.values():
+            conn.close()
+        oidc_auth._connections.clear()
+        super().tearDown()
+
+    def test_fetch_and_trim(self):
+        """Test that only the used fields are cached, for max-age seconds"""
+        entry = oidc_auth.load_discovery_cache()
+
+        self.assertEqual(set(entry['config']), set(oidc_auth.DISCOVERY_FIELDS))
+        self.assertNotIn('x5c', entry['jwks']['keys'][0])
+        self.assertAlmostEqual(entry['expiry'] - time.time(), 120, delta=5)
+        self.assertTrue((self.cache_dir / 'discovery.json').exists())
+
+    def test_revalidates_with_etag(self):
+        """Test that a refresh sends the stored ETags and keeps the cached bodies on 304"""
+        first = oidc_auth.load_discovery_cache()
+        second = oidc_auth.load_discovery_cache(refresh=True)
+
+        self.assertEqual(second['config'], first['config'])
+        self.assertEqual(second['jwks'], first['jwks'])
+        self.assertEqual([etag for _, etag in _DiscoveryHandler.requests_seen],
+                         [None, None, '"v1"', '"v1"'])
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'requires Unix domain sockets')
+class TestTokenAgent(CacheDirTestCase):
+    """Test the token agent protocol"""
+
+    def test_agent_round_trip(self):
+        """Test that a running agent answers with the ExecCredential for its token"""
+        from itlc import token_agent
+
+        expiry = int(time.time()) + 3600
+        agent = token_agent.TokenAgent(socket_path=self.cache_dir / 'agent.sock')
+        original = token_agent.get_cached_oidc_token
+        token_agent.get_cached_oidc_token = lambda: ('tok', expiry)
+        saved_runtime_dir = os.environ.pop('XDG_RUNTIME_DIR', None)
+        try:
+            thread = threading.Thread(target=agent.serve_forever, daemon=True)
+            thread.start()
+            self.addCleanup(thread.join, 5)
+            self.addCleanup(agent.shutdown)
+            for _ in range(50):
+                if agent.socket_path.exists():
+                    break
+                time.sleep(0.05)
+
+            credential = oidc_auth.request_agent_credential()
+        finally:
+            token_agent.get_cached_oidc_token = original
+            if saved_runtime_dir is not None:
+                os.environ['XDG_RUNTIME_DIR'] = saved_runtime_dir
+
+        self.assertEqual(credential, oidc_auth.format_credential('tok', expiry))
+
+    def test_no_agent(self):
+        """Test that a missing agent is reported as no credential"""
+        saved_runtime_dir = os.environ.pop('XDG_RUNTIME_DIR', None)
+        try:
+            self.assertIsNone(oidc_auth.request_agent_credential(timeout=0.2))
+        finally:
+            if saved_runtime_dir is not None:
+                os.environ['XDG_RUNTIME_DIR'] = saved_runtime_dir
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+"""
+Tests for the itlc package's public names
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+# Add the package to the path for testing
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import itlc
+from itlc.token_cache import TokenCache
+
+
+class TestPublicNames(unittest.TestCase):
+    """Test the names exported by the itlc package"""
+
+    def test_token_cache_is_instance(self):
+        """Test that itlc.token_cache is the shared TokenCache, not its submodule"""
+        self.assertIsInstance(itlc.token_cache, TokenCache)
+
+    @unittest.skipUnless(importlib.util.find_spec('click') and importlib.util.find_spec('requests'),
+                         'the CLI needs click and requests')
+    def test_token_cache_after_cli_import(self):
+        """Test that importing the CLI, which imports the submodule, keeps the instance"""
+        import itlc.__main__  # noqa: F401
+
+        self.assertIsInstance(itlc.token_cache, TokenCache)
+
+    def test_lazy_names(self):
+        """Test that lazily imported names resolve and are listed"""
+        from itlc.oidc_auth import OIDCConfig
+
+        self.assertIs(itlc.OIDCConfig, OIDCConfig)
+        self.assertIn('KeycloakClient', dir(itlc))
+        with self.assertRaises(AttributeError):
+            itlc.not_a_name
+
+
+if __name__ == '__main__':
+    unittest.main()